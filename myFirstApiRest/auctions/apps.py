@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AuctionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "auctions"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from myFirstApiRest.metrics import registry
+        from .cache import stats
+        registry.register_collector(stats.prometheus_lines)
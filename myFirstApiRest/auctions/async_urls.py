@@ -0,0 +1,12 @@
+from django.urls import path
+from .async_views import AsyncAuctionBidList, AsyncAuctionDetail, AsyncAuctionList, AsyncAuctionSearch, AsyncCategoryList
+
+# Lecturas async (auctions/async_views.py), con las mismas rutas que auctions/urls.py
+app_name = "auctions_async"
+urlpatterns = [
+    path('categories/', AsyncCategoryList.as_view(), name='category-list'),
+    path('', AsyncAuctionList.as_view(), name='auction-list'),
+    path('search/', AsyncAuctionSearch.as_view(), name='auction-search'),
+    path('<int:pk>/', AsyncAuctionDetail.as_view(), name='auction-detail'),
+    path('<int:auction_id>/bids/', AsyncAuctionBidList.as_view(), name='auction-bid-list'),
+]
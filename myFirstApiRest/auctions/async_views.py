@@ -0,0 +1,191 @@
+"""
+Variantes async de las lecturas más frecuentes, en /api/async/auctions/ con
+las mismas rutas que las vistas de auctions/views.py (solo GET).
+
+Bajo ASGI las vistas síncronas de DRF se ejecutan en el pool de hilos de
+asgiref, un hilo por petición. Estas vistas corren en el event loop: solo las
+consultas pasan por el ORM async de Django (acount(), afirst(), async for) y el
+serializer, la paginación y el JSON se hacen en el propio loop. Reutilizan los
+serializers, OptionalCursorPagination y ORJSONRenderer, así que las respuestas
+son las mismas que las de las vistas síncronas.
+
+No autentican: las lecturas equivalentes son públicas.
+"""
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+from myFirstApiRest.renderers import ORJSONRenderer
+from . import cache
+from .etags import ETAG_COLUMNS, auction_etag
+from .facets import asearch_facets, requested_facets
+from .filters import annotate_is_open, check_search_pagination, filter_open, filter_search
+from .models import Auction, Bid, Category
+from .query_planning import plan_for
+from .search import search_truncated
+from .serializers import (AuctionListCreateSerializer, BidListCreateSerializer, CategoryListCreateSerializer,
+                          auction_from_cache, cached_auction)
+
+renderer = ORJSONRenderer()
+
+
+async def apaginate_page_number(pagination, queryset, request):
+    """
+    PageNumberPagination.paginate_queryset() con el COUNT y la página leídos
+    con el ORM async. Deja `pagination` listo para get_paginated_response().
+    """
+    paginator = pagination.django_paginator_class(queryset, pagination.get_page_size(request))
+    # count es un cached_property: con el valor ya puesto Paginator no consulta
+    paginator.count = await queryset.acount()
+    page_number = pagination.get_page_number(request, paginator)
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(pagination.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    page.object_list = [obj async for obj in page.object_list]
+    pagination.page = page
+    pagination.request = request
+    return page.object_list
+
+
+class AsyncReadView(View):
+    http_method_names = ['get', 'head', 'options']
+    serializer_class = None
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    cursor_ordering = ()
+
+    async def get(self, request, *args, **kwargs):
+        self.request = Request(request)
+        try:
+            return await self.read()
+        except (APIException, Http404) as exc:
+            # Mismo cuerpo de error que las vistas de DRF
+            response = exception_handler(exc, {'view': self, 'request': self.request})
+            return self.render(response.data, response.status_code)
+
+    async def read(self):
+        raise NotImplementedError
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(renderer.render(data), status=status_code, content_type=renderer.media_type)
+
+    def get_serializer(self, *args, **kwargs):
+        return self.serializer_class(*args, context={'request': self.request, 'view': self}, **kwargs)
+
+    def optimize(self, queryset, serializer):
+        # Igual que OptimizedQuerysetMixin
+        plan = plan_for(serializer)
+        plan.columns.update(field.lstrip('-') for field in self.cursor_ordering)
+        return plan.apply(queryset)
+
+    async def paginate(self, queryset):
+        """Devuelve el cuerpo paginado (count/next/previous/results o el de cursor)."""
+        pagination = self.pagination_class()
+        serializer = self.get_serializer(many=True)
+        queryset = self.optimize(queryset, serializer)
+        if pagination.wants_cursor(self.request, self):
+            # La paginación keyset decodifica el cursor y consulta en el mismo método
+            page = await sync_to_async(pagination.paginate_queryset)(queryset, self.request, self)
+        else:
+            page = await apaginate_page_number(pagination, queryset, self.request)
+        serializer.instance = page
+        return pagination.get_paginated_response(serializer.data).data
+
+    async def auction_etag(self, auction_id):
+        """(etag, respuesta 304 o None), como AuctionETagMixin. etag es None si la subasta no existe."""
+        row = await Auction.objects.filter(pk=auction_id).values_list(*ETAG_COLUMNS).afirst()
+        if row is None:
+            return None, None
+        # Estas vistas siempre responden JSON, sin negociar el formato
+        etag = auction_etag(auction_id, row, self.request, renderer.format)
+        if_none_match = parse_etags(self.request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return etag, response
+        return etag, None
+
+
+class AsyncCategoryList(AsyncReadView):
+    serializer_class = CategoryListCreateSerializer
+
+    async def read(self):
+        data = await cache.aread_through('categories', 'categories', self.request.get_full_path(),
+                                         lambda: self.paginate(Category.objects.all()))
+        return self.render(data)
+
+
+class AsyncAuctionList(AsyncReadView):
+    serializer_class = AuctionListCreateSerializer
+    cursor_ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        return filter_open(Auction.objects.order_by('-created_at', '-id'), self.request)
+
+    async def read(self):
+        queryset = annotate_is_open(self.get_queryset(), self.request)
+        return self.render(await self.paginate(queryset))
+
+
+class AsyncAuctionSearch(AsyncAuctionList):
+    async def read(self):
+        check_search_pagination(self.request, self.pagination_class(), self)
+        facets = requested_facets(self.request)
+        queryset = Auction.objects.order_by('-created_at', '-id')
+        if self.request.query_params.get('description'):
+            # Fuera de PostgreSQL el índice en memoria se construye con consultas síncronas
+            queryset = await sync_to_async(filter_search)(queryset, self.request)
+        else:
+            queryset = filter_search(queryset, self.request)
+        data = await self.paginate(annotate_is_open(queryset, self.request))
+        if facets:
+            data['facets'] = await asearch_facets(queryset, self.request, facets)
+        return search_truncated(self.request, self.render(data))
+
+
+class AsyncAuctionDetail(AsyncReadView):
+    serializer_class = AuctionListCreateSerializer
+
+    async def read(self):
+        pk = self.kwargs['pk']
+        etag, not_modified = await self.auction_etag(pk)
+        if etag is None:
+            raise NotFound("No Auction matches the given query.")
+        if not_modified:
+            return not_modified
+
+        async def compute():
+            serializer = self.get_serializer()
+            queryset = annotate_is_open(Auction.objects.filter(pk=pk), self.request)
+            serializer.instance = await self.optimize(queryset, serializer).afirst()
+            if serializer.instance is None:
+                raise NotFound("No Auction matches the given query.")
+            return cached_auction(serializer)
+
+        entry = await cache.aread_through('auction', f'auction:{pk}', self.request.get_full_path(), compute)
+        response = self.render(auction_from_cache(entry, self.request))
+        response['ETag'] = etag
+        return response
+
+
+class AsyncAuctionBidList(AsyncReadView):
+    serializer_class = BidListCreateSerializer
+    # El cursor se apoya en columnas inmutables: con -price una puja subida
+    # con PATCH cambiaría de posición y se saltaría o repetiría entre páginas
+    cursor_ordering = ('-creation_date', '-id')
+
+    async def read(self):
+        auction_id = self.kwargs['auction_id']
+        etag, not_modified = await self.auction_etag(auction_id)
+        if not_modified:
+            return not_modified
+        response = self.render(await self.paginate(Bid.objects.filter(auction__id=auction_id)))
+        if etag:
+            response['ETag'] = etag
+        return response
@@ -0,0 +1,104 @@
+"""
+Utilidades compartidas por los comandos de benchmark (auctions/management/commands/bench_*).
+"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from .models import Auction, Category
+
+
+BENCH_CATEGORY = 'Benchmark'
+
+WORDS = (
+    'camiseta', 'balon', 'bota', 'bufanda', 'firmada', 'oficial', 'retro', 'edicion', 'limitada',
+    'temporada', 'anoeta', 'txuri', 'urdin', 'copa', 'liga', 'final', 'portero', 'guantes',
+    'entrada', 'abono', 'poster', 'reloj', 'gorra', 'chaqueta', 'vintage', 'coleccion', 'jugador',
+    'capitan', 'historica', 'europa', 'derbi', 'estadio', 'medalla', 'trofeo', 'autografo',
+)
+BRANDS = ('Adidas', 'Nike', 'Puma', 'Kappa', 'Macron', 'Umbro', 'Joma', 'Errea')
+
+
+def percentile(values, pct):
+    """Percentil por interpolación lineal (pct entre 0 y 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def bench_category():
+    category, _ = Category.objects.get_or_create(name=BENCH_CATEGORY)
+    return category
+
+
+def create_auction(**overrides):
+    """Crea una subasta abierta con valores válidos para los benchmarks."""
+    fields = {
+        'title': 'Benchmark auction',
+        'description': 'Subasta creada por un benchmark',
+        'closed_at': timezone.now() + timedelta(days=30),
+        'thumbnail': 'https://example.com/thumb.png',
+        'price': Decimal('1.00'),
+        'stock': 1,
+        'rating': Decimal('3.00'),
+        'brand': 'Benchmark',
+    }
+    fields.update(overrides)
+    if 'category' not in fields and 'category_id' not in fields:
+        fields['category'] = bench_category()
+    return Auction.objects.create(**fields)
+
+
+def synthetic_auctions(count, categories, auctioneers=(None,), seed=0):
+    """
+    Genera `count` subastas sin guardar (para bulk_create) con títulos y
+    descripciones construidos a partir de WORDS.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    for _ in range(count):
+        yield Auction(
+            title=' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize(),
+            description=' '.join(rng.choices(WORDS, k=rng.randint(15, 60))) + f' ref{rng.randint(0, 999999):06d}',
+            closed_at=now + timedelta(days=rng.randint(-30, 60)),
+            thumbnail='https://example.com/thumb.png',
+            price=Decimal(rng.randint(100, 500000)) / 100,
+            stock=rng.randint(1, 10),
+            rating=Decimal(rng.randint(100, 500)) / 100,
+            brand=rng.choice(BRANDS),
+            category=rng.choice(categories),
+            auctioneer=rng.choice(auctioneers),
+        )
+
+
+def bulk_insert(model, objects, batch_size=5000):
+    """bulk_create por lotes sin materializar todo el generador en memoria."""
+    batch, total = [], 0
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+class Stopwatch:
+    """Mide el tiempo de pared de un bloque: `with Stopwatch() as sw: ...; sw.elapsed`."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
@@ -0,0 +1,127 @@
+"""
+Pub/sub para el stream de pujas en vivo (/api/auctions/<id>/bids/stream/).
+
+Broker es la interfaz: publish() se llama desde código síncrono (las vistas
+y servicios que guardan pujas, desde cualquier hilo) y subscribe() desde el
+event loop de ASGI. InProcessBroker reparte los mensajes dentro del proceso;
+con varios workers se puede configurar otro broker en settings.AUCTIONS_BROKER
+(p. ej. uno sobre Redis o LISTEN/NOTIFY de PostgreSQL) con la misma interfaz.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    async def get(self):
+        """Espera y devuelve el siguiente mensaje."""
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class Broker:
+    def publish(self, channel, message):
+        """Publica `message` (un dict) en `channel`. Es seguro llamarlo desde cualquier hilo."""
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        """Devuelve una Subscription; se llama desde el event loop que la va a consumir."""
+        raise NotImplementedError
+
+
+class LocalSubscription(Subscription):
+    def __init__(self, broker, channel, loop, max_queue):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def put(self, message):
+        # Se ejecuta en el loop del suscriptor. Si el cliente no da abasto se
+        # descarta el mensaje más antiguo: solo importa el precio más reciente.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(Broker):
+    """
+    Reparto en memoria. Los suscriptores se agrupan por event loop, así un
+    publish hace un único call_soon_threadsafe por loop aunque haya miles
+    de conexiones escuchando.
+    """
+
+    def __init__(self, max_queue=None):
+        self.max_queue = max_queue or getattr(settings, 'AUCTIONS_SSE_QUEUE_SIZE', 100)
+        self._lock = threading.Lock()
+        self._channels = defaultdict(lambda: defaultdict(set))
+
+    def subscribe(self, channel):
+        subscription = LocalSubscription(self, channel, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._channels[channel][subscription.loop].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            loops = self._channels.get(subscription.channel)
+            if loops is None:
+                return
+            subscriptions = loops.get(subscription.loop)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del loops[subscription.loop]
+            if not loops:
+                del self._channels[subscription.channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                groups = [self._channels[channel]] if channel in self._channels else []
+            else:
+                groups = list(self._channels.values())
+            return sum(len(subscriptions) for loops in groups for subscriptions in loops.values())
+
+    def publish(self, channel, message):
+        with self._lock:
+            targets = [(loop, tuple(subscriptions)) for loop, subscriptions in self._channels.get(channel, {}).items()]
+        for loop, subscriptions in targets:
+            try:
+                loop.call_soon_threadsafe(_fan_out, subscriptions, message)
+            except RuntimeError:
+                # El loop ya se cerró: sus suscripciones no volverán a leer
+                for subscription in subscriptions:
+                    self.unsubscribe(subscription)
+        return sum(len(subscriptions) for _, subscriptions in targets)
+
+
+def _fan_out(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.put(message)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'AUCTIONS_BROKER', 'auctions.broker.InProcessBroker')
+                _broker = import_string(path)()
+    return _broker
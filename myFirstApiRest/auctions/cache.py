@@ -0,0 +1,190 @@
+"""
+Caché de lectura (read-through) para los GET de categorías, del detalle de
+subasta y de las facetas de búsqueda sin filtros, sobre el framework de caché
+de Django (settings.CACHES).
+
+Cada entrada pertenece a un espacio de nombres ('categories', 'auction:<pk>',
+'auction-facets')
+con un número de generación. Invalidar es cambiar la generación, así todas
+las variantes cacheadas (páginas, parámetros) quedan obsoletas de golpe. Las
+señales de auctions/signals.py invalidan al guardar o borrar Category,
+Auction, Bid y Rating.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+PREFIX = 'auctions'
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUCTIONS_CACHE_ALIAS', 'default')]
+
+
+def cache_timeout():
+    return getattr(settings, 'AUCTIONS_CACHE_TIMEOUT', 300)
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = defaultdict(int)
+
+    def record(self, kind, result):
+        with self._lock:
+            self.counts[(kind, result)] += 1
+
+    def get(self, kind, result):
+        return self.counts[(kind, result)]
+
+    def prometheus_lines(self):
+        with self._lock:
+            items = sorted(self.counts.items())
+        lines = [
+            '# HELP auctions_cache_requests_total Lecturas de la caché de auctions por resultado.',
+            '# TYPE auctions_cache_requests_total counter',
+        ]
+        for (kind, result), count in items:
+            lines.append(f'auctions_cache_requests_total{{cache="{kind}",result="{result}"}} {count}')
+        return lines
+
+
+stats = CacheStats()
+
+
+def _generation(cache, namespace):
+    key = f'{PREFIX}:gen:{namespace}'
+    generation = cache.get(key)
+    if generation is None:
+        # Generación nueva (nunca reutilizada) si la clave no existe o fue desalojada
+        generation = time.time_ns()
+        if not cache.add(key, generation, timeout=None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+async def _ageneration(cache, namespace):
+    key = f'{PREFIX}:gen:{namespace}'
+    generation = await cache.aget(key)
+    if generation is None:
+        generation = time.time_ns()
+        if not await cache.aadd(key, generation, timeout=None):
+            generation = await cache.aget(key, generation)
+    return generation
+
+
+def generation(namespace):
+    """Generación actual del espacio de nombres: cambia cada vez que se invalida."""
+    return _generation(get_cache(), namespace)
+
+
+def invalidate(namespace):
+    """Deja obsoletas todas las entradas del espacio de nombres al confirmar la transacción."""
+    def bump():
+        get_cache().set(f'{PREFIX}:gen:{namespace}', time.time_ns(), timeout=None)
+    transaction.on_commit(bump)
+
+
+def read_through(kind, namespace, variant, compute, timeout=None):
+    """
+    Devuelve el valor cacheado o lo calcula con `compute()`. Si otra petición
+    ya lo está calculando (lock con cache.add) se espera a que termine en vez
+    de repetir la consulta (protección contra estampidas). `timeout` en
+    segundos; por defecto AUCTIONS_CACHE_TIMEOUT.
+    """
+    cache = get_cache()
+    digest = hashlib.md5(variant.encode()).hexdigest()
+    key = f'{PREFIX}:{namespace}:{_generation(cache, namespace)}:{digest}'
+    value = cache.get(key)
+    if value is not None:
+        stats.record(kind, 'hit')
+        return value
+
+    lock_key = f'{key}:lock'
+    lock_timeout = getattr(settings, 'AUCTIONS_CACHE_LOCK_TIMEOUT', 5)
+    acquired = cache.add(lock_key, 1, timeout=lock_timeout)
+    if not acquired:
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            value = cache.get(key)
+            if value is not None:
+                stats.record(kind, 'hit')
+                return value
+            if cache.get(lock_key) is None:
+                # El cálculo terminó sin guardar nada (p. ej. un 404)
+                break
+        # El que tenía el lock no terminó a tiempo: se calcula igualmente
+    stats.record(kind, 'miss')
+    try:
+        value = compute()
+        cache.set(key, value, timeout=timeout or cache_timeout())
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+    return value
+
+
+class _SyncAsAsync:
+    """Métodos a* que llaman a los síncronos sin cambiar de hilo."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def aget(self, *args, **kwargs):
+        return self.cache.get(*args, **kwargs)
+
+    async def aadd(self, *args, **kwargs):
+        return self.cache.add(*args, **kwargs)
+
+    async def aset(self, *args, **kwargs):
+        return self.cache.set(*args, **kwargs)
+
+    async def adelete(self, *args, **kwargs):
+        return self.cache.delete(*args, **kwargs)
+
+
+async def aread_through(kind, namespace, variant, compute, timeout=None):
+    """
+    read_through() para vistas async: `compute` es una corrutina. La API async
+    de las cachés de Django pasa por un hilo en cada llamada; con una caché en
+    memoria del proceso (no bloquea) se usa la síncrona directamente.
+    """
+    cache = get_cache()
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        cache = _SyncAsAsync(cache)
+    digest = hashlib.md5(variant.encode()).hexdigest()
+    key = f'{PREFIX}:{namespace}:{await _ageneration(cache, namespace)}:{digest}'
+    value = await cache.aget(key)
+    if value is not None:
+        stats.record(kind, 'hit')
+        return value
+
+    lock_key = f'{key}:lock'
+    lock_timeout = getattr(settings, 'AUCTIONS_CACHE_LOCK_TIMEOUT', 5)
+    acquired = await cache.aadd(lock_key, 1, timeout=lock_timeout)
+    if not acquired:
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+            value = await cache.aget(key)
+            if value is not None:
+                stats.record(kind, 'hit')
+                return value
+            if await cache.aget(lock_key) is None:
+                break
+    stats.record(kind, 'miss')
+    try:
+        value = await compute()
+        await cache.aset(key, value, timeout=timeout or cache_timeout())
+    finally:
+        if acquired:
+            await cache.adelete(lock_key)
+    return value
@@ -0,0 +1,55 @@
+"""
+GET condicional (If-None-Match -> 304) para los recursos que cuelgan de una
+subasta. El ETag sale de Auction.version/updated_at, que se actualizan con
+cada puja, comentario o valoración, así que se puede responder 304 con una
+consulta por clave primaria, sin ejecutar el serializer ni las consultas del
+listado. Incluye también si la subasta está abierta: al pasar closed_at cambia
+isOpen sin que cambie la versión, y el formato del renderer negociado: la
+misma URL con otro Accept (JSON o la API navegable) es otra representación,
+por eso las respuestas llevan Vary: Accept.
+"""
+import hashlib
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .filters import request_now
+from .models import Auction
+
+# Columnas de Auction que necesita auction_etag()
+ETAG_COLUMNS = ('version', 'updated_at', 'closed_at')
+
+
+def auction_etag(auction_id, row, request, renderer_format):
+    """ETag para la petición a partir de la fila (version, updated_at, closed_at) de la subasta."""
+    version, updated_at, closed_at = row
+    is_open = closed_at is None or closed_at > request_now(request)
+    variant = f'{renderer_format}:{request.get_full_path()}'
+    digest = hashlib.md5(f'{version}:{updated_at.isoformat()}:{is_open}:{variant}'.encode()).hexdigest()
+    return quote_etag(f'{auction_id}-{version}-{digest[:16]}')
+
+
+class AuctionETagMixin:
+    """
+    Añade ETag a los GET de la vista. `etag_auction_kwarg` indica qué kwarg de
+    la URL es el id de la subasta. El ETag incluye la URL completa porque la
+    página o los parámetros cambian el contenido, y el formato negociado.
+    """
+    etag_auction_kwarg = 'pk'
+
+    def get(self, request, *args, **kwargs):
+        auction_id = self.kwargs.get(self.etag_auction_kwarg)
+        row = Auction.objects.filter(pk=auction_id).values_list(*ETAG_COLUMNS).first()
+        if row is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = auction_etag(auction_id, row, request, request.accepted_renderer.format)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Accept',))
+        return response
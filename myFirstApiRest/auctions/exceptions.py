@@ -0,0 +1,12 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class BidConflict(APIException):
+    """
+    La puja ha perdido la carrera contra otra puja concurrente: cuando se
+    intentó aplicar, el precio de la subasta ya era igual o superior.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'La puja debe ser mayor que el precio actual de la subasta.'
+    default_code = 'bid_conflict'
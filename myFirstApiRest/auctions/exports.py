@@ -0,0 +1,174 @@
+"""
+Exportación en streaming (CSV o NDJSON) del catálogo de subastas y del
+historial de pujas de una subasta.
+
+Las filas se leen con values_list().iterator(chunk_size=...) (cursor de
+servidor en PostgreSQL) y se escriben por bloques en un StreamingHttpResponse:
+la memoria usada no depende del tamaño del resultado. Bajo ASGI los bloques se
+piden de uno en uno con sync_to_async (un iterador síncrono haría que Django
+lo leyera entero antes de enviar nada). El formato se elige con la negociación
+de DRF: cabecera Accept o ?format=csv / ?format=ndjson.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer
+from rest_framework.views import APIView
+from myFirstApiRest.renderers import ORJSONRenderer, orjson
+from .search import search_truncated
+
+# (nombre de la columna exportada, campo para values_list)
+AUCTION_COLUMNS = (
+    ('id', 'id'),
+    ('title', 'title'),
+    ('description', 'description'),
+    ('brand', 'brand'),
+    ('category', 'category__name'),
+    ('auctioneer', 'auctioneer__username'),
+    ('price', 'price'),
+    ('current_bid', 'current_bid'),
+    ('bid_count', 'bid_count'),
+    ('last_bid_at', 'last_bid_at'),
+    ('stock', 'stock'),
+    ('rating', 'rating'),
+    ('thumbnail', 'thumbnail'),
+    ('created_at', 'created_at'),
+    ('closed_at', 'closed_at'),
+    ('final_price', 'final_price'),
+    ('winner', 'winning_bid__bidder'),
+)
+BID_COLUMNS = (
+    ('id', 'id'),
+    ('auction', 'auction_id'),
+    ('bidder', 'bidder'),
+    ('price', 'price'),
+    ('creation_date', 'creation_date'),
+)
+
+# Filas por cada trozo enviado al cliente
+FLUSH_ROWS = 500
+
+
+def export_chunk_size():
+    return getattr(settings, 'AUCTIONS_EXPORT_CHUNK_SIZE', 2000)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    ExportAPIView escribe las filas en streaming con lines(); render() sirve
+    para las Response normales (una lista de dicts o un dict) con el mismo formato.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def lines(self, headers, rows):
+        return csv_lines(headers, rows)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        headers = list(items[0]) if items else []
+        return b''.join(self.lines(headers, ([item.get(name) for name in headers] for item in items)))
+
+
+class NDJSONRenderer(CSVRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def lines(self, headers, rows):
+        return ndjson_lines(headers, rows)
+
+
+def _json_default(value):
+    # Igual que la API: decimales como cadena
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} no se puede exportar a JSON")
+
+
+def _dumps(row):
+    if orjson is not None:
+        return orjson.dumps(row, default=_json_default)
+    return json.dumps(row, default=_json_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def ndjson_lines(headers, rows):
+    lines = []
+    for row in rows:
+        lines.append(_dumps(dict(zip(headers, row))))
+        if len(lines) == FLUSH_ROWS:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def csv_lines(headers, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        if count % FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _ablocks(blocks):
+    # Cada bloque se genera en el hilo de la petición (thread_sensitive): el cursor no cambia de conexión
+    read = sync_to_async(next)
+    while (block := await read(blocks, None)) is not None:
+        yield block
+
+
+def stream_blocks(request, blocks):
+    """Iterador para StreamingHttpResponse: asíncrono si la petición llegó por ASGI."""
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return _ablocks(iter(blocks))
+    return blocks
+
+
+class ExportAPIView(APIView):
+    """
+    GET que exporta `get_queryset()` con las columnas de `columns`. Las
+    subclases definen get_queryset() (ordenado) y filename.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    columns = ()
+    filename = 'export'
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        headers = [name for name, _ in self.columns]
+        rows = (self.get_queryset()
+                .values_list(*[field for _, field in self.columns])
+                .iterator(chunk_size=export_chunk_size()))
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(stream_blocks(request, renderer.lines(headers, rows)),
+                                         content_type=f'{renderer.media_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}.{renderer.format}"'
+        # ?description= fuera de PostgreSQL exporta solo las más relevantes
+        return search_truncated(request, response)
+
+    def handle_exception(self, exc):
+        # Los errores (400, 401, 404) salen en JSON aunque se haya pedido CSV o NDJSON
+        self.request.accepted_renderer = ORJSONRenderer()
+        self.request.accepted_media_type = ORJSONRenderer.media_type
+        return super().handle_exception(exc)
@@ -0,0 +1,122 @@
+"""
+Facetas de AuctionSearch (?facets=...): cuántas subastas del resultado hay
+por categoría, por marca y en cada tramo de precio.
+
+Las tres salen de una sola consulta agrupada por (categoría, marca, tramo de
+precio) sobre el queryset ya filtrado; los totales de cada faceta se suman en
+Python a partir de esas filas. Sin filtros el resultado es el mismo para todos
+los clientes y se guarda en la caché (espacio 'auction-facets'), que las
+señales invalidan cuando se crea, borra o cambia de categoría, marca o precio
+una subasta.
+"""
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from . import cache
+from .filters import TRUE_VALUES
+from .models import Auction
+
+FACETS = ('category', 'brand', 'price')
+FACETS_NAMESPACE = 'auction-facets'
+
+FACETS_PARAMETER = OpenApiParameter(
+    'facets', str, description=(
+        "true o una lista de category, brand y price separados por comas: añade a la respuesta "
+        "`facets` con el número de resultados por categoría, por marca y por tramo de precio."
+    ),
+)
+
+# Parámetros que filtran la búsqueda: sin ninguno se usan las facetas cacheadas
+SEARCH_FILTERS = ('description', 'category', 'priceMin', 'priceMax', 'open')
+
+
+def price_edges():
+    """Límites de los tramos de precio: (10, 25) da <10, [10, 25) y >=25."""
+    return [Decimal(str(edge)) for edge in getattr(settings, 'AUCTIONS_FACET_PRICE_EDGES', (10, 25, 50, 100, 250, 500, 1000))]
+
+
+def brand_limit():
+    return getattr(settings, 'AUCTIONS_FACET_BRAND_LIMIT', 20)
+
+
+def requested_facets(request):
+    """Facetas pedidas en ?facets=, en el orden de FACETS, o () si no se piden."""
+    value = request.query_params.get('facets', '').strip().lower()
+    if not value or value in ('false', '0'):
+        return ()
+    if value in TRUE_VALUES:
+        return FACETS
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = names - set(FACETS)
+    if unknown:
+        raise ValidationError({'facets': f"Facetas no válidas: {', '.join(sorted(unknown))}. "
+                                         f"Usa true o {', '.join(FACETS)}."})
+    return tuple(name for name in FACETS if name in names)
+
+
+def is_unfiltered(request):
+    return not any(request.query_params.get(name, '').strip() for name in SEARCH_FILTERS)
+
+
+def facet_rows(queryset):
+    """Consulta agrupada: una fila (category_id, category__name, brand, bucket, total) por combinación."""
+    edges = price_edges()
+    bucket = Case(
+        *[When(price__lt=edge, then=Value(index)) for index, edge in enumerate(edges)],
+        default=Value(len(edges)), output_field=IntegerField(),
+    )
+    return (queryset.order_by()
+            .annotate(bucket=bucket)
+            .values_list('category_id', 'category__name', 'brand', 'bucket')
+            .annotate(total=Count('id')))
+
+
+def build_facets(rows, facets):
+    """Totales por faceta a partir de las filas de facet_rows()."""
+    categories, brands = {}, {}
+    edges = price_edges()
+    buckets = [0] * (len(edges) + 1)
+    for category_id, category_name, brand, bucket, total in rows:
+        key = (category_id, category_name)
+        categories[key] = categories.get(key, 0) + total
+        brands[brand] = brands.get(brand, 0) + total
+        buckets[bucket] += total
+
+    data = {}
+    if 'category' in facets:
+        data['category'] = [
+            {'id': category_id, 'name': name, 'count': total}
+            for (category_id, name), total in sorted(categories.items(), key=lambda item: (-item[1], item[0][1]))
+        ]
+    if 'brand' in facets:
+        data['brand'] = [
+            {'value': brand, 'count': total}
+            for brand, total in sorted(brands.items(), key=lambda item: (-item[1], item[0]))[:brand_limit()]
+        ]
+    if 'price' in facets:
+        bounds = [None] + edges + [None]
+        data['price'] = [
+            {'min': None if low is None else str(low), 'max': None if high is None else str(high), 'count': total}
+            for low, high, total in zip(bounds, bounds[1:], buckets)
+        ]
+    return data
+
+
+def search_facets(queryset, request, facets):
+    """Facetas del resultado de la búsqueda; sin filtros, las de la caché."""
+    if is_unfiltered(request):
+        return cache.read_through('facets', FACETS_NAMESPACE, ','.join(facets),
+                                  lambda: build_facets(facet_rows(Auction.objects.all()), facets))
+    return build_facets(facet_rows(queryset), facets)
+
+
+async def asearch_facets(queryset, request, facets):
+    async def compute(queryset):
+        return build_facets([row async for row in facet_rows(queryset)], facets)
+
+    if is_unfiltered(request):
+        return await cache.aread_through('facets', FACETS_NAMESPACE, ','.join(facets),
+                                         lambda: compute(Auction.objects.all()))
+    return await compute(queryset)
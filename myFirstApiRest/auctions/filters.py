@@ -0,0 +1,108 @@
+"""
+Estado abierto/cerrado de las subastas en las vistas.
+
+request_now() da un único "ahora" por petición: la anotación is_open, el
+filtro ?open= y los serializers comparan contra el mismo instante, así una
+subasta que cierra a mitad de la petición no sale abierta en un sitio y
+cerrada en otro.
+
+filter_search() aplica los filtros de AuctionSearch (también los usa la
+exportación de auctions/exports.py). Con ?description= el resultado se
+ordena por relevancia y no admite ?pagination=cursor (ver
+check_search_pagination()).
+"""
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from .search import get_search_backend
+
+OPEN_PARAMETER = OpenApiParameter(
+    'open', bool, description="true: solo subastas abiertas; false: solo cerradas.",
+)
+
+IDS_PARAMETER = OpenApiParameter(
+    'ids', str, description=(
+        "Ids separados por comas (1,2,3): devuelve esas subastas en ese orden, sin paginar, con la "
+        "categoría y la puja más alta, y en `missing` los ids que no existen. Máximo AUCTIONS_BATCH_MAX."
+    ),
+)
+
+TRUE_VALUES = ('true', '1')
+FALSE_VALUES = ('false', '0')
+
+
+def request_now(request=None):
+    if request is None:
+        return timezone.now()
+    # Se guarda en el HttpRequest para compartirlo con todo lo que lo reciba
+    request = getattr(request, '_request', request)
+    now = getattr(request, 'auctions_now', None)
+    if now is None:
+        now = request.auctions_now = timezone.now()
+    return now
+
+
+def annotate_is_open(queryset, request):
+    return queryset.with_is_open(request_now(request))
+
+
+def filter_open(queryset, request):
+    value = request.query_params.get('open', '').strip().lower()
+    if not value:
+        return queryset
+    if value in TRUE_VALUES:
+        return queryset.open(request_now(request))
+    if value in FALSE_VALUES:
+        return queryset.closed(request_now(request))
+    raise ValidationError({'open': "Valor no válido: usa true o false."})
+
+
+def filter_search(queryset, request):
+    params = request.query_params
+    texto = params.get('description', '')
+    category_name = params.get('category', '')
+    precio_min = params.get('priceMin', None)
+    precio_max = params.get('priceMax', None)
+
+    filters = Q()
+    if category_name:
+        filters &= Q(category__name__iexact=category_name)
+    if precio_min:
+        filters &= Q(price__gte=precio_min)
+    if precio_max:
+        filters &= Q(price__lte=precio_max)
+
+    queryset = filter_open(queryset.filter(filters), request)
+    if texto:
+        # Búsqueda por índice (GIN en PostgreSQL) ordenada por relevancia
+        queryset = get_search_backend().search(queryset, texto, request)
+    return queryset
+
+
+def check_search_pagination(request, paginator, view):
+    """
+    El cursor de AuctionSearch va por (-created_at, -id): con ?description= se
+    perdería el orden por relevancia, así que esa combinación se rechaza.
+    """
+    if request.query_params.get('description') and paginator.wants_cursor(request, view):
+        raise ValidationError({'pagination': "La búsqueda por texto se ordena por relevancia y no admite "
+                                             "paginación por cursor: usa ?page=."})
+
+
+def requested_ids(request):
+    """Ids de ?ids=1,2,3 en el orden pedido y sin repetidos, o None si no se pasa el parámetro."""
+    value = request.query_params.get('ids')
+    if value is None:
+        return None
+    try:
+        ids = list(dict.fromkeys(int(part) for part in value.split(',') if part.strip()))
+    except ValueError:
+        raise ValidationError({'ids': "Usa ids numéricos separados por comas."})
+    if not ids:
+        raise ValidationError({'ids': "Indica al menos un id."})
+    limit = getattr(settings, 'AUCTIONS_BATCH_MAX', 100)
+    if len(ids) > limit:
+        raise ValidationError({'ids': f"Como máximo {limit} subastas por petición."})
+    return ids
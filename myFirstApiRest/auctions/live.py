@@ -0,0 +1,80 @@
+"""
+Pujas en vivo: publicación desde los servicios y stream Server-Sent Events.
+"""
+import asyncio
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from .broker import get_broker
+from .models import Auction
+
+
+def auction_channel(auction_id):
+    return f'auction:{auction_id}:bids'
+
+
+def publish_bid(bid, current_bid, bid_count):
+    """Publica la puja cuando se confirme la transacción que la guarda."""
+    message = {
+        'type': 'bid',
+        'bid': {
+            'id': bid.pk,
+            'auction': bid.auction_id,
+            'price': str(bid.price),
+            'bidder': bid.bidder,
+            'creation_date': bid.creation_date,
+        },
+        'current_bid': str(current_bid),
+        'bid_count': bid_count,
+    }
+    transaction.on_commit(lambda: get_broker().publish(auction_channel(bid.auction_id), message))
+
+
+def format_event(message, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(message, cls=DjangoJSONEncoder))
+    return '\n'.join(lines) + '\n\n'
+
+
+async def read_snapshot(auction_id):
+    """Estado actual de la subasta para el evento snapshot, o None si no existe."""
+    auction = await Auction.objects.filter(pk=auction_id).values('price', 'current_bid', 'bid_count').afirst()
+    if auction is None:
+        return None
+    return {
+        'type': 'snapshot', 'auction': auction_id, 'price': str(auction['price']),
+        'current_bid': None if auction['current_bid'] is None else str(auction['current_bid']),
+        'bid_count': auction['bid_count'],
+    }
+
+
+async def bid_events(auction_id):
+    """
+    Generador asíncrono del stream: primero el estado actual y después cada
+    puja publicada. Si no hay pujas en AUCTIONS_SSE_KEEPALIVE segundos se
+    manda un comentario para que los proxies no cierren la conexión.
+    """
+    keepalive = getattr(settings, 'AUCTIONS_SSE_KEEPALIVE', 15)
+    subscription = get_broker().subscribe(auction_channel(auction_id))
+    try:
+        # El snapshot se lee ya suscrito: una puja confirmada entre medias
+        # sale en el snapshot, en el stream o en los dos, pero nunca se pierde
+        snapshot = await read_snapshot(auction_id)
+        if snapshot is None:
+            return
+        yield format_event(snapshot, event='snapshot')
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(message, event=message['type'], event_id=message['bid']['id'])
+    finally:
+        # Se ejecuta también cuando el cliente se desconecta (CancelledError)
+        subscription.close()
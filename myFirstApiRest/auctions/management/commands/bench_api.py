@@ -0,0 +1,392 @@
+import itertools
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from auctions.benchmarks import create_auction, percentile
+from auctions.models import Auction, Bid, Category, Comment, Rating
+from auctions.services import place_bid, submit_rating
+from users.models import CustomUser
+
+PREFIX = 'bench-api'
+PASSWORD = 'bench-api-pass-123'
+
+# Rutas que no se pueden medir petición a petición
+SKIPPED = {
+    'auctions:auction-bid-stream': "stream SSE sin fin (ver bench_sse)",
+}
+
+
+class Route:
+    """
+    Una petición a medir. `path` y `data` pueden usar los valores del contexto
+    ({auction}, {bid}, {n}...); `prepare(ctx)` crea antes de cada petición
+    (sin cronometrar) lo que la petición consume, p. ej. el objeto a borrar.
+    `auth` es True (usuario del benchmark, staff), False o 'target' (el
+    usuario creado por prepare, para rutas que actúan sobre uno mismo).
+    """
+
+    def __init__(self, url_name, method, path, data=None, prepare=None, auth=True, expect=(200,)):
+        self.url_name = url_name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.prepare = prepare
+        self.auth = auth
+        self.expect = expect
+
+    @property
+    def key(self):
+        return f'{self.method} {self.url_name}'
+
+
+def _unique(ctx):
+    return f"{PREFIX}-{ctx['run']}-{ctx['n']}"
+
+
+def _new_category(ctx):
+    return {'target': Category.objects.create(name=_unique(ctx)).pk}
+
+
+def _new_auction(ctx):
+    return {'target': create_auction(title=_unique(ctx), auctioneer_id=ctx['user_id'], category_id=ctx['category']).pk}
+
+
+def _new_bid(ctx):
+    return {'target': place_bid(ctx['auction'], _next_price(ctx), PREFIX).pk}
+
+
+def _new_rating(ctx):
+    auction = create_auction(title=_unique(ctx), auctioneer_id=ctx['user_id'], category_id=ctx['category'])
+    user = CustomUser.objects.get(pk=ctx['user_id'])
+    return {'target': submit_rating(auction, user, Decimal('4.00')).pk, 'fresh_auction': auction.pk}
+
+
+def _fresh_auction(ctx):
+    # Cada usuario solo puede valorar una vez cada subasta
+    return {'fresh_auction': create_auction(title=_unique(ctx), auctioneer_id=ctx['user_id'], category_id=ctx['category']).pk}
+
+
+def _new_comment(ctx):
+    today = date.today()
+    comment = Comment.objects.create(title=_unique(ctx), text='bench', creation_date=today, modification_date=today,
+                                     user_id=ctx['user_id'], auction_id=ctx['auction'])
+    return {'target': comment.pk}
+
+
+def _new_user(ctx):
+    user = CustomUser.objects.create_user(username=_unique(ctx), password=PASSWORD, birth_date=date(1990, 1, 1))
+    refresh = RefreshToken.for_user(user)
+    return {'target': user.pk, 'target_token': str(refresh.access_token), 'target_refresh': str(refresh)}
+
+
+def _new_refresh(ctx):
+    # Con ROTATE_REFRESH_TOKENS cada refresh queda en la lista negra tras usarse
+    return {'refresh': str(RefreshToken.for_user(CustomUser.objects.get(pk=ctx['user_id'])))}
+
+
+def _next_price(ctx):
+    # Las pujas tienen que superar siempre a la anterior
+    return next(ctx['prices'])
+
+
+def _auction_body(ctx):
+    return {
+        'title': _unique(ctx), 'description': 'Subasta creada por bench_api',
+        'closed_at': (timezone.now() + timedelta(days=30)).isoformat(),
+        'thumbnail': 'https://example.com/thumb.png', 'price': '10.00', 'stock': 1, 'rating': '3.00',
+        'brand': 'Bench', 'category': ctx['category'], 'auctioneer': ctx['user_id'],
+    }
+
+
+def _comment_body(ctx):
+    today = date.today().isoformat()
+    return {'title': _unique(ctx), 'text': 'bench', 'creation_date': today, 'modification_date': today,
+            'user': ctx['user_id'], 'auction': ctx['auction']}
+
+
+ROUTES = (
+    Route('auctions:category-list-create', 'GET', '/api/auctions/categories/', auth=False),
+    Route('auctions:category-list-create', 'POST', '/api/auctions/categories/',
+          data=lambda ctx: {'name': _unique(ctx)}, expect=(201,)),
+    Route('auctions:category-detail', 'GET', '/api/auctions/categories/{category}/', auth=False),
+    Route('auctions:category-detail', 'PATCH', '/api/auctions/categories/{target}/',
+          data=lambda ctx: {'name': _unique(ctx) + '-x'}, prepare=_new_category),
+    Route('auctions:category-detail', 'DELETE', '/api/auctions/categories/{target}/', prepare=_new_category, expect=(204,)),
+    Route('auctions:auction-list-create', 'GET', '/api/auctions/', auth=False),
+    Route('auctions:auction-list-create', 'GET', '/api/auctions/?pagination=cursor', auth=False),
+    Route('auctions:auction-list-create', 'GET', '/api/auctions/?open=true&fields=id,title,thumbnail,price,isOpen', auth=False),
+    Route('auctions:auction-list-create', 'GET', '/api/auctions/?ids={auction}', auth=False),
+    Route('auctions:auction-list-create', 'POST', '/api/auctions/', data=_auction_body, expect=(201,)),
+    Route('auctions:auction-search', 'GET', '/api/auctions/search/?description=camiseta', auth=False),
+    Route('auctions:auction-search', 'GET', '/api/auctions/search/?category={category_name}&priceMin=10&priceMax=500', auth=False),
+    Route('auctions:auction-search', 'GET', '/api/auctions/search/?category={category_name}&priceMin=10&priceMax=500&facets=true', auth=False),
+    Route('auctions:auction-export', 'GET', '/api/auctions/export/?category={category_name}&priceMax=500'),
+    Route('auctions:auction-detail', 'GET', '/api/auctions/{auction}/', auth=False),
+    Route('auctions:auction-detail', 'PATCH', '/api/auctions/{auction}/', data=lambda ctx: {'stock': ctx['n'] % 5 + 1}),
+    Route('auctions:auction-detail', 'DELETE', '/api/auctions/{target}/', prepare=_new_auction, expect=(204,)),
+    Route('auctions:action-from-users', 'GET', '/api/auctions/users/'),
+    Route('auctions:auction-bid-list-create', 'GET', '/api/auctions/{auction}/bids/', auth=False),
+    Route('auctions:auction-bid-list-create', 'POST', '/api/auctions/{auction}/bids/',
+          data=lambda ctx: {'price': str(_next_price(ctx)), 'bidder': PREFIX, 'auction': ctx['auction']}, expect=(201,)),
+    Route('auctions:auction-bid-export', 'GET', '/api/auctions/{auction}/bids/export/?format=ndjson'),
+    Route('auctions:bid-detail', 'GET', '/api/auctions/{auction}/bids/{bid}', auth=False),
+    Route('auctions:bid-detail', 'PATCH', '/api/auctions/{auction}/bids/{target}',
+          data=lambda ctx: {'price': str(_next_price(ctx))}, prepare=_new_bid),
+    Route('auctions:bid-batch-create', 'POST', '/api/auctions/bids/batch/', expect=(201,),
+          data=lambda ctx: {'bids': [{'auction': ctx['auction'], 'price': str(_next_price(ctx)), 'bidder': PREFIX}
+                                     for _ in range(50)]}),
+    Route('auctions:rating-create-update', 'GET', '/api/auctions/ratings/'),
+    Route('auctions:rating-create-update', 'POST', '/api/auctions/ratings/',
+          data=lambda ctx: {'auction': ctx['fresh_auction'], 'user': ctx['user_id'], 'value': '4.50'},
+          prepare=_fresh_auction, expect=(201,)),
+    Route('auctions:rating-delete', 'GET', '/api/auctions/ratings/{rating}/'),
+    Route('auctions:rating-delete', 'PATCH', '/api/auctions/ratings/{target}/', data={'value': '2.50'}, prepare=_new_rating),
+    Route('auctions:rating-delete', 'DELETE', '/api/auctions/ratings/{target}/', prepare=_new_rating, expect=(204,)),
+    Route('auctions:comment-create', 'GET', '/api/auctions/{auction}/comments/', auth=False),
+    Route('auctions:comment-create', 'POST', '/api/auctions/{auction}/comments/', data=_comment_body, expect=(201,)),
+    Route('auctions:comment-delete', 'GET', '/api/auctions/{auction}/comments/{comment}'),
+    Route('auctions:comment-delete', 'PATCH', '/api/auctions/{auction}/comments/{target}',
+          data={'text': 'bench editado'}, prepare=_new_comment),
+    Route('auctions:comment-delete', 'DELETE', '/api/auctions/{auction}/comments/{target}', prepare=_new_comment, expect=(204,)),
+    Route('users:user-register', 'POST', '/api/users/register/', auth=False, expect=(201,),
+          data=lambda ctx: {'username': _unique(ctx), 'email': f'{_unique(ctx)}@example.com', 'password': PASSWORD,
+                            'birth_date': '1990-01-01', 'first_name': 'Bench', 'last_name': 'Api'}),
+    Route('users:user-list', 'GET', '/api/users/'),
+    Route('users:user-detail', 'GET', '/api/users/{user_id}/'),
+    Route('users:user-detail', 'PATCH', '/api/users/{target}/', data={'locality': 'Donostia'}, prepare=_new_user),
+    Route('users:user-detail', 'DELETE', '/api/users/{target}/', prepare=_new_user, expect=(204,)),
+    Route('users:log-out', 'POST', '/api/users/log-out/', data=lambda ctx: {'refresh': ctx['target_refresh']},
+          prepare=_new_user, auth='target', expect=(205,)),
+    Route('users:user-profile', 'GET', '/api/users/profile/'),
+    Route('users:user-profile', 'PATCH', '/api/users/profile/', data={'municipality': 'Donostia'}),
+    Route('users:user-profile', 'DELETE', '/api/users/profile/', prepare=_new_user, auth='target', expect=(204,)),
+    Route('users:change-password', 'POST', '/api/users/change-password/', prepare=_new_user, auth='target',
+          data={'old_password': PASSWORD, 'new_password': PASSWORD}),
+    Route('token_obtain_pair', 'POST', '/api/token/', auth=False,
+          data=lambda ctx: {'username': ctx['username'], 'password': PASSWORD}),
+    Route('token_refresh', 'POST', '/api/token/refresh/', auth=False, prepare=_new_refresh,
+          data=lambda ctx: {'refresh': ctx['refresh']}),
+)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class InProcessTransport:
+    """Peticiones con el cliente de pruebas de DRF; cuenta las consultas SQL."""
+    name = 'in-process'
+
+    def __init__(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+
+    def request(self, method, path, data, headers):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = self.client.generic(method, path, json.dumps(data) if data is not None else '',
+                                           content_type='application/json', **headers)
+            # Las exportaciones se generan mientras se leen: el tiempo incluye todo el cuerpo
+            size = sum(map(len, response.streaming_content)) if response.streaming else len(response.content)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, size, counter.count
+
+
+class HTTPTransport:
+    """Peticiones HTTP contra un servidor local (runserver, gunicorn, uvicorn)."""
+    name = 'http'
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data, headers):
+        body = json.dumps(data).encode() if data is not None else None
+        http_headers = {'Content-Type': 'application/json'}
+        if 'HTTP_AUTHORIZATION' in headers:
+            http_headers['Authorization'] = headers['HTTP_AUTHORIZATION']
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=http_headers)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, content = error.code, error.read()
+        return status, time.perf_counter() - start, len(content), None
+
+
+class Command(BaseCommand):
+    help = (
+        "Recorre todas las rutas de auctions/urls.py y users/urls.py y mide latencia "
+        "(p50/p95/p99), throughput y consultas SQL por petición. Usa los datos que haya "
+        "en la base de datos (ver generate_data) y guarda los resultados en JSON para comparar ejecuciones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help="Peticiones medidas por ruta.")
+        parser.add_argument('--warmup', type=int, default=5, help="Peticiones previas sin medir por ruta.")
+        parser.add_argument('--base-url', help="Medir contra un servidor (misma base de datos) en vez de en proceso.")
+        parser.add_argument('--only', action='append', help="Solo rutas cuyo nombre contenga este texto (repetible).")
+        parser.add_argument('--output', help="Fichero JSON donde guardar los resultados.")
+        parser.add_argument('--compare', help="JSON de una ejecución anterior con el que comparar p95.")
+        parser.add_argument('--keep', action='store_true', help="No borrar los datos creados al terminar.")
+
+    def handle(self, *args, **options):
+        transport = HTTPTransport(options['base_url']) if options['base_url'] else InProcessTransport()
+        routes = [route for route in ROUTES
+                  if not options['only'] or any(text in route.key for text in options['only'])]
+        if not options['only']:
+            self.check_coverage()
+
+        ctx = self.setup_fixtures()
+        results = []
+        started_at = datetime.now().isoformat(timespec='seconds')
+        # Los 4xx esperados (p. ej. validaciones) no deben llenar la salida de avisos
+        request_logger = logging.getLogger('django.request')
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            self.stdout.write(f"{'route':<46} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'errors':>7}")
+            for route in routes:
+                result = self.run_route(transport, route, ctx, options['warmup'], options['iterations'])
+                results.append(result)
+                queries = '-' if result['queries_avg'] is None else f"{result['queries_avg']:.1f}"
+                self.stdout.write(
+                    f"{route.key:<46} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                    f"{result['rps']:>8.1f} {queries:>8} {result['errors']:>7}"
+                )
+        finally:
+            request_logger.setLevel(previous_level)
+            if not options['keep']:
+                self.cleanup()
+
+        report = {
+            'meta': {
+                'started_at': started_at,
+                'transport': transport.name,
+                'base_url': options['base_url'],
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+            },
+            'dataset': {model.__name__: model.objects.count()
+                        for model in (CustomUser, Category, Auction, Bid, Rating, Comment)},
+            'routes': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['output']}")
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def check_coverage(self):
+        names = set()
+        for namespace in ('auctions', 'users'):
+            resolver = get_resolver().namespace_dict[namespace][1]
+            names.update(f'{namespace}:{pattern.name}' for pattern in resolver.url_patterns if pattern.name)
+        missing = names - {route.url_name for route in ROUTES} - set(SKIPPED)
+        for name in sorted(missing):
+            self.stderr.write(self.style.WARNING(f"Ruta sin medir: {name}"))
+        for name, reason in SKIPPED.items():
+            self.stdout.write(f"Se omite {name}: {reason}")
+
+    def setup_fixtures(self):
+        run = int(time.time())
+        user = CustomUser.objects.create_user(
+            username=f'{PREFIX}-{run}', email=f'{PREFIX}-{run}@example.com', password=PASSWORD,
+            birth_date=date(1990, 1, 1), is_staff=True,
+        )
+        category = Category.objects.create(name=f'{PREFIX}-{run}')
+        auction = create_auction(title=f'{PREFIX} auction', category=category, auctioneer=user)
+        bid = place_bid(auction.pk, Decimal('2.00'), PREFIX)
+        rater = CustomUser.objects.create_user(username=f'{PREFIX}-{run}-rater', password=PASSWORD, birth_date=date(1990, 1, 1))
+        rating = submit_rating(auction, rater, Decimal('4.00'))
+        today = date.today()
+        comment = Comment.objects.create(title=PREFIX, text='bench', creation_date=today, modification_date=today,
+                                         user=user, auction=auction)
+        refresh = RefreshToken.for_user(user)
+        return {
+            'run': run, 'n': 0, 'prices': (Decimal(n) for n in itertools.count(3)),
+            'user_id': user.pk, 'username': user.username,
+            'token': str(refresh.access_token),
+            'category': category.pk, 'category_name': category.name,
+            'auction': auction.pk, 'bid': bid.pk, 'rating': rating.pk, 'comment': comment.pk,
+        }
+
+    def run_route(self, transport, route, base_ctx, warmup, iterations):
+        timings, queries, sizes = [], [], []
+        statuses = Counter()
+        for i in range(warmup + iterations):
+            base_ctx['n'] += 1
+            ctx = dict(base_ctx)
+            if route.prepare:
+                ctx.update(route.prepare(base_ctx))
+            data = route.data(ctx) if callable(route.data) else route.data
+            headers = {}
+            if route.auth:
+                token = ctx['target_token'] if route.auth == 'target' else ctx['token']
+                headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+            status, elapsed, size, count = transport.request(route.method, route.path.format(**ctx), data, headers)
+            if i < warmup:
+                continue
+            statuses[status] += 1
+            timings.append(elapsed * 1000)
+            sizes.append(size)
+            if count is not None:
+                queries.append(count)
+
+        total = sum(timings) / 1000
+        errors = sum(count for status, count in statuses.items() if status not in route.expect)
+        return {
+            'route': route.url_name,
+            'method': route.method,
+            'path': route.path,
+            'requests': len(timings),
+            'errors': errors,
+            'status': {str(status): count for status, count in sorted(statuses.items())},
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99),
+            'mean_ms': sum(timings) / len(timings) if timings else 0.0,
+            'rps': len(timings) / total if total else 0.0,
+            'queries_avg': sum(queries) / len(queries) if queries else None,
+            'bytes_avg': sum(sizes) / len(sizes) if sizes else 0,
+        }
+
+    def compare(self, path, results):
+        try:
+            with open(path) as f:
+                previous = {(r['method'], r['route'], r['path']): r for r in json.load(f)['routes']}
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f"No se puede leer {path}: {error}")
+        self.stdout.write(f"\n{'route':<46} {'p95 antes':>10} {'p95 ahora':>10} {'cambio':>8}")
+        for result in results:
+            before = previous.get((result['method'], result['route'], result['path']))
+            if before is None or not before['p95_ms']:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+            key = f"{result['method']} {result['route']}"
+            self.stdout.write(f"{key:<46} {before['p95_ms']:>10.2f} {result['p95_ms']:>10.2f} {change:>+7.1f}%")
+
+    def cleanup(self):
+        # Las subastas, pujas, valoraciones y comentarios caen en cascada
+        CustomUser.objects.filter(username__startswith=PREFIX).delete()
+        Category.objects.filter(name__startswith=PREFIX).delete()
@@ -0,0 +1,129 @@
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from auctions.benchmarks import percentile
+from auctions.models import Bid
+
+# (escenario, aplicación, prefijo de las rutas)
+SCENARIOS = (
+    ('wsgi', 'myFirstApiRest.wsgi:application', '/api/auctions/'),
+    ('asgi sync', 'myFirstApiRest.asgi:application', '/api/auctions/'),
+    ('asgi async', 'myFirstApiRest.asgi:application', '/api/async/auctions/'),
+)
+PATHS = (
+    'categories/',
+    '?fields=id,title,price,isOpen',
+    'search/?priceMax=50',
+    '{auction}/',
+    '{auction}/bids/',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Peticiones concurrentes contra un servidor real (un proceso): vistas síncronas bajo WSGI, "
+        "las mismas bajo ASGI y las vistas async de /api/async/auctions/ bajo ASGI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Peticiones por ruta y escenario.")
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--path', action='append', help="Rutas relativas al prefijo (repetible).")
+
+    def handle(self, *args, **options):
+        auction = Bid.objects.values_list('auction_id', flat=True).first()
+        if auction is None:
+            raise CommandError("No hay pujas: genera datos antes con generate_data.")
+        paths = [path.format(auction=auction) for path in options['path'] or PATHS]
+
+        self.stdout.write(f"{options['requests']} peticiones por ruta, concurrencia {options['concurrency']}")
+        self.stdout.write(f"{'escenario':<11} {'ruta':<34} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errores':>8}")
+        totals = {}
+        for name, app, prefix in SCENARIOS:
+            server, command = self.start_server(name, app, options['port'], options['concurrency'])
+            try:
+                for path in paths:
+                    url = prefix + path
+                    self.run(options['port'], url, min(50, options['requests']), options['concurrency'])  # calentamiento
+                    rate, samples, errors = self.run(options['port'], url, options['requests'], options['concurrency'])
+                    totals.setdefault(name, []).append(rate)
+                    self.stdout.write(f"{name:<11} {path[:34]:<34} {rate:>8.0f} {percentile(samples, 50):>8.2f} "
+                                      f"{percentile(samples, 99):>8.2f} {errors:>8}")
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+            self.stdout.write(f"  servidor: {' '.join(command[1:] if command[0] == sys.executable else command)}")
+
+        self.stdout.write("Media de req/s por escenario:")
+        for name, rates in totals.items():
+            self.stdout.write(f"  {name:<11} {sum(rates) / len(rates):>8.0f}")
+
+    def start_server(self, name, app, port, concurrency):
+        if name == 'wsgi' and shutil.which('gunicorn'):
+            command = ['gunicorn', '-w', '1', '-k', 'gthread', '--threads', str(concurrency),
+                       '-b', f'127.0.0.1:{port}', '--log-level', 'warning', app]
+        else:
+            # Sin gunicorn, WSGI con el adaptador de uvicorn (pool de hilos propio)
+            command = [sys.executable, '-m', 'uvicorn', app, '--host', '127.0.0.1', '--port', str(port),
+                       '--log-level', 'warning', '--no-access-log']
+            if name == 'wsgi':
+                command[4:4] = ['--interface', 'wsgi']
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'myFirstApiRest.settings'))
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"{name}: el servidor terminó al arrancar:\n{server.stderr.read().decode()}")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                return server, command
+            except OSError:
+                time.sleep(0.1)
+        server.terminate()
+        raise CommandError(f"{name}: el servidor no arrancó en 30 s")
+
+    def run(self, port, url, count, concurrency):
+        """Cada hilo usa su propia conexión keep-alive; devuelve (req/s, latencias en ms, errores)."""
+        remaining = iter(range(count))
+        lock = threading.Lock()
+        samples, errors = [], [0]
+
+        def worker():
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    start = time.perf_counter()
+                    try:
+                        conn.request('GET', url)
+                        response = conn.getresponse()
+                        response.read()
+                        ok = response.status == 200
+                    except (OSError, http.client.HTTPException):
+                        conn.close()
+                        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                        ok = False
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        samples.append(elapsed)
+                        errors[0] += not ok
+            finally:
+                conn.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        return count / (time.perf_counter() - start), samples, errors[0]
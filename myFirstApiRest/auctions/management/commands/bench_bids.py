@@ -0,0 +1,86 @@
+import random
+import threading
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from rest_framework.exceptions import APIException
+from auctions.benchmarks import Stopwatch, create_auction
+from auctions.models import Auction, Bid
+from auctions.services import place_bid
+
+
+def naive_bid(auction_id, price, bidder):
+    # Réplica del camino antiguo: leer, comparar y guardar sin transacción ni bloqueo
+    auction = Auction.objects.get(pk=auction_id)
+    if price > (auction.current_bid or auction.price):
+        auction.current_bid = price
+        auction.bid_count += 1
+        auction.save()
+    return Bid.objects.create(auction=auction, price=price, bidder=bidder)
+
+
+class Command(BaseCommand):
+    help = "Lanza cientos de pujas en paralelo contra una misma subasta y mide throughput y actualizaciones perdidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bids', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--mode', choices=['service', 'naive'], default='service',
+                            help="'service' usa auctions.services.place_bid, 'naive' el camino antiguo.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep', action='store_true', help="No borrar la subasta al terminar.")
+
+    def handle(self, *args, **options):
+        bid_fn = place_bid if options['mode'] == 'service' else naive_bid
+        auction = create_auction(title='Hot auction (bench_bids)')
+
+        prices = [Decimal(i) for i in range(2, options['bids'] + 2)]
+        random.Random(options['seed']).shuffle(prices)
+        workers = max(1, options['workers'])
+        chunks = [prices[i::workers] for i in range(workers)]
+
+        lock = threading.Lock()
+        accepted, conflicts, errors = [], [0], [0]
+
+        def worker(chunk, n):
+            try:
+                for price in chunk:
+                    try:
+                        bid_fn(auction.pk, price, f'bench-{n}')
+                    except APIException:
+                        with lock:
+                            conflicts[0] += 1
+                    except DatabaseError:
+                        with lock:
+                            errors[0] += 1
+                    else:
+                        with lock:
+                            accepted.append(price)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(chunk, n)) for n, chunk in enumerate(chunks)]
+        with Stopwatch() as sw:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        auction.refresh_from_db()
+        current = auction.current_bid or auction.price
+        lost = sum(1 for price in accepted if price > current)
+        expected = max(accepted) if accepted else auction.price
+
+        self.stdout.write(f"mode:            {options['mode']}")
+        self.stdout.write(f"bids:            {len(prices)} ({workers} workers)")
+        self.stdout.write(f"elapsed:         {sw.elapsed:.3f}s")
+        self.stdout.write(f"throughput:      {len(prices) / sw.elapsed:.1f} bids/s")
+        self.stdout.write(f"accepted:        {len(accepted)}")
+        self.stdout.write(f"conflicts (409): {conflicts[0]}")
+        self.stdout.write(f"db errors:       {errors[0]}")
+        self.stdout.write(f"current bid:     {current} (max accepted {expected})")
+        self.stdout.write(f"bid count:       {auction.bid_count} (accepted {len(accepted)})")
+        self.stdout.write(f"lost updates:    {lost}")
+
+        if not options['keep']:
+            auction.delete()
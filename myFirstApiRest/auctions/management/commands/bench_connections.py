@@ -0,0 +1,90 @@
+import statistics
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from auctions.benchmarks import percentile
+
+# Sin caché, para que cada petición llegue a la base de datos
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cuánto cuesta abrir la conexión a la base de datos en cada petición: la misma URL "
+        "con una conexión por petición, con conexiones persistentes y, si está configurado, con pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/auctions/categories/')
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--conn-max-age', type=int, default=60)
+
+    def handle(self, *args, **options):
+        # WSGIHandler y no el cliente de pruebas: el cliente de pruebas nunca cierra
+        # la conexión al acabar la petición y escondería justo lo que se quiere medir.
+        handler = WSGIHandler()
+        settings_dict = connection.settings_dict
+        original = {key: settings_dict[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        pool = settings_dict['OPTIONS'].pop('pool', None)
+        modes = [
+            ('una conexión por petición', {'CONN_MAX_AGE': 0}, None),
+            ('persistente', {'CONN_MAX_AGE': options['conn_max_age'], 'CONN_HEALTH_CHECKS': True}, None),
+        ]
+        if pool:
+            modes.append(('pool', {'CONN_MAX_AGE': 0}, pool))
+
+        self.stdout.write(f"{connection.vendor}: GET {options['path']} x {options['requests']}")
+        self.stdout.write(f"{'modo':<26} {'conexiones':>10} {'p50 ms':>8} {'p95 ms':>8} {'media ms':>9}")
+        try:
+            with override_settings(CACHES=NO_CACHE):
+                for name, overrides, pool_options in modes:
+                    connection.close()
+                    settings_dict.update(overrides)
+                    if pool_options:
+                        settings_dict['OPTIONS']['pool'] = pool_options
+                    samples, opened = self.run(handler, options['path'], options['requests'])
+                    self.stdout.write(f"{name:<26} {opened:>10} {percentile(samples, 50):>8.3f} "
+                                      f"{percentile(samples, 95):>8.3f} {statistics.mean(samples):>9.3f}")
+                    settings_dict['OPTIONS'].pop('pool', None)
+                    connection.close()
+        finally:
+            settings_dict.update(original)
+            if pool:
+                settings_dict['OPTIONS']['pool'] = pool
+
+    def run(self, handler, path, count):
+        opened = []
+
+        def receiver(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(receiver)
+        try:
+            self.request(handler, path)  # calentamiento (imports, URLconf...)
+            opened.clear()
+            samples = []
+            for _ in range(count):
+                start = time.perf_counter()
+                self.request(handler, path)
+                samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection_created.disconnect(receiver)
+        return samples, len(opened)
+
+    def request(self, handler, path):
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'wsgi.input': BytesIO()}
+        setup_testing_defaults(environ)
+        status = []
+        response = handler(environ, lambda code, headers, exc_info=None: status.append(code))
+        try:
+            b''.join(response)
+        finally:
+            # close() lanza request_finished, donde Django cierra o conserva la conexión
+            response.close()
+        if not status[0].startswith('200'):
+            raise CommandError(f"GET {path} devolvió {status[0]}")
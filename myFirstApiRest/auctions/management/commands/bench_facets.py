@@ -0,0 +1,53 @@
+import statistics
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from auctions.benchmarks import Stopwatch
+from auctions.models import Auction, Category
+
+SEARCHES = (
+    '',
+    '?priceMin=10&priceMax=500',
+    '?category={category}',
+    '?category={category}&priceMax=50',
+    '?description=camiseta',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la latencia de /api/auctions/search/ con y sin ?facets=true (categoría, marca y "
+        "tramos de precio) para varias combinaciones de filtros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--search', action='append', dest='searches',
+                            help="Parámetros de búsqueda, p. ej. '?priceMax=50' (se puede repetir).")
+
+    def handle(self, *args, **options):
+        category = Category.objects.filter(auctions__isnull=False).values_list('name', flat=True).first()
+        if category is None:
+            raise CommandError("No hay subastas: genera datos antes con generate_data.")
+        client = APIClient(SERVER_NAME='localhost')
+        self.stdout.write(f"{Auction.objects.count()} subastas, mediana de {options['repeat']} peticiones")
+        self.stdout.write(f"{'búsqueda':<36} {'sin ms':>8} {'con ms':>8} {'ratio':>6} {'consultas':>10}")
+        for search in options['searches'] or SEARCHES:
+            path = '/api/auctions/search/' + search.format(category=category)
+            plain, _ = self.measure(client, path, options['repeat'])
+            faceted, queries = self.measure(client, path + ('&' if '?' in path else '?') + 'facets=true',
+                                            options['repeat'])
+            self.stdout.write(f"{search or '(sin filtros)':<36} {plain:>8.1f} {faceted:>8.1f} "
+                              f"{faceted / plain:>5.1f}x {queries:>10}")
+
+    def measure(self, client, path, repeat):
+        client.get(path)  # calentamiento (índice de búsqueda, caché de facetas)
+        samples = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries, Stopwatch() as sw:
+                response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f"GET {path} devolvió {response.status_code}")
+            samples.append(sw.elapsed * 1000)
+        return statistics.median(samples), len(queries)
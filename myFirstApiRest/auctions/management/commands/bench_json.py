@@ -0,0 +1,64 @@
+import statistics
+from io import BytesIO
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from auctions.benchmarks import BENCH_CATEGORY, Stopwatch, bulk_insert, synthetic_auctions
+from auctions.models import Auction, Category
+from auctions.query_planning import optimize_queryset
+from auctions.search import invalidate_index
+from auctions.serializers import AuctionListCreateSerializer
+from myFirstApiRest.renderers import ORJSONParser, ORJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = "Compara JSONRenderer/JSONParser de DRF con los de orjson sobre páginas de AuctionListCreateSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=api_settings.PAGE_SIZE)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson no está instalado: ORJSONRenderer usaría el renderer de DRF.")
+        page_size = options['page_size']
+        category, _ = Category.objects.get_or_create(name=BENCH_CATEGORY)
+        existing = Auction.objects.filter(category=category).count()
+        if existing < page_size:
+            bulk_insert(Auction, synthetic_auctions(page_size - existing, [category], seed=existing))
+            invalidate_index()
+
+        queryset = optimize_queryset(Auction.objects.filter(category=category).order_by('-created_at', '-id'),
+                                     AuctionListCreateSerializer)
+        # Igual que la vista paginada: el listado va dentro de un dict con count/next/previous
+        page = {
+            'count': page_size, 'next': None, 'previous': None,
+            'results': AuctionListCreateSerializer(queryset[:page_size], many=True).data,
+        }
+
+        drf_bytes = JSONRenderer().render(page)
+        fast_bytes = ORJSONRenderer().render(page)
+        if drf_bytes != fast_bytes:
+            raise CommandError("ORJSONRenderer no produce los mismos bytes que JSONRenderer.")
+
+        def timed(func):
+            samples = []
+            for _ in range(options['repeat']):
+                with Stopwatch() as sw:
+                    func()
+                samples.append(sw.elapsed * 1000)
+            return statistics.median(samples)
+
+        serialize = timed(lambda: AuctionListCreateSerializer(list(queryset[:page_size]), many=True).data)
+        rows = (
+            ('render', timed(lambda: JSONRenderer().render(page)), timed(lambda: ORJSONRenderer().render(page))),
+            ('parse', timed(lambda: JSONParser().parse(BytesIO(drf_bytes), 'application/json', {})),
+             timed(lambda: ORJSONParser().parse(BytesIO(drf_bytes), 'application/json', {}))),
+        )
+
+        self.stdout.write(f"Página de {page_size} subastas: {len(drf_bytes)} bytes (idénticos con ambos renderers)")
+        self.stdout.write(f"Consulta + serializer: {serialize:.3f} ms (mediana)")
+        self.stdout.write(f"{'paso':<8} {'DRF ms':>9} {'orjson ms':>10} {'speedup':>8}")
+        for name, drf, fast in rows:
+            self.stdout.write(f"{name:<8} {drf:>9.3f} {fast:>10.3f} {drf / fast:>7.1f}x")
@@ -0,0 +1,58 @@
+import statistics
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from auctions.benchmarks import Stopwatch, create_auction
+from auctions.models import Bid
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia de la página 1 y la página N de la lista de pujas con paginación por número y por cursor."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', type=int, default=1000, help="Página profunda a medir.")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help="No borrar los datos generados al terminar.")
+
+    def handle(self, *args, **options):
+        page_size = api_settings.PAGE_SIZE
+        deep_page = options['page']
+        rows = page_size * deep_page
+
+        auction = create_auction(title='Pagination auction (bench_pagination)')
+        self.stdout.write(f"Generando {rows} pujas...")
+        for start in range(0, rows, options['batch_size']):
+            end = min(start + options['batch_size'], rows)
+            Bid.objects.bulk_create(
+                Bid(auction=auction, price=Decimal(i + 1), bidder=f'bench-{i}') for i in range(start, end)
+            )
+
+        client = APIClient(SERVER_NAME='localhost')
+        url = f'/api/auctions/{auction.pk}/bids/'
+
+        # Avanzar por los cursores hasta la página profunda (no se cronometra)
+        cursor_url = f'{url}?pagination=cursor'
+        cursor_first = cursor_url
+        for _ in range(deep_page - 1):
+            cursor_url = client.get(cursor_url).json()['next']
+
+        cases = [
+            ('page-number', 1, f'{url}?page=1'),
+            ('page-number', deep_page, f'{url}?page={deep_page}'),
+            ('cursor', 1, cursor_first),
+            ('cursor', deep_page, cursor_url),
+        ]
+        self.stdout.write(f"{'mode':<12} {'page':>6} {'median ms':>10} {'max ms':>10}")
+        for mode, page, case_url in cases:
+            timings = []
+            for _ in range(options['repeat']):
+                with Stopwatch() as sw:
+                    response = client.get(case_url)
+                assert response.status_code == 200, response.status_code
+                timings.append(sw.elapsed * 1000)
+            self.stdout.write(f"{mode:<12} {page:>6} {statistics.median(timings):>10.2f} {max(timings):>10.2f}")
+
+        if not options['keep']:
+            auction.delete()
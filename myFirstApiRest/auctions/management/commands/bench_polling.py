@@ -0,0 +1,40 @@
+import statistics
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+from auctions.benchmarks import Stopwatch, create_auction
+from auctions.models import Bid
+
+
+class Command(BaseCommand):
+    help = "Mide el throughput del polling de detalle y pujas de una subasta con y sin If-None-Match."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--bids', type=int, default=100)
+        parser.add_argument('--keep', action='store_true', help="No borrar la subasta al terminar.")
+
+    def handle(self, *args, **options):
+        auction = create_auction(title='Polled auction (bench_polling)')
+        Bid.objects.bulk_create(
+            Bid(auction=auction, price=Decimal(i + 2), bidder=f'bench-{i}') for i in range(options['bids'])
+        )
+        client = APIClient(SERVER_NAME='localhost')
+        n = options['requests']
+
+        self.stdout.write(f"{'endpoint':<10} {'mode':<14} {'req/s':>9} {'median ms':>10}")
+        for name, url in (('detail', f'/api/auctions/{auction.pk}/'), ('bids', f'/api/auctions/{auction.pk}/bids/')):
+            etag = client.get(url)['ETag']
+            for mode, headers in (('full', {}), ('conditional', {'HTTP_IF_NONE_MATCH': etag})):
+                timings = []
+                with Stopwatch() as total:
+                    for _ in range(n):
+                        with Stopwatch() as sw:
+                            response = client.get(url, **headers)
+                        timings.append(sw.elapsed * 1000)
+                expected = 304 if headers else 200
+                assert response.status_code == expected, response.status_code
+                self.stdout.write(f"{name:<10} {mode:<14} {n / total.elapsed:>9.1f} {statistics.median(timings):>10.2f}")
+
+        if not options['keep']:
+            auction.delete()
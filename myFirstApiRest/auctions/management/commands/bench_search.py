@@ -0,0 +1,62 @@
+import statistics
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from rest_framework.settings import api_settings
+from auctions.benchmarks import BENCH_CATEGORY, Stopwatch, bulk_insert, synthetic_auctions
+from auctions.models import Auction, Category
+from auctions.search import InvertedIndexSearchBackend, get_search_backend, invalidate_index
+
+
+class Command(BaseCommand):
+    help = "Compara la búsqueda con icontains frente al índice de búsqueda sobre subastas sintéticas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--auctions', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--query', action='append', dest='queries',
+                            help="Texto a buscar (se puede repetir).")
+
+    def handle(self, *args, **options):
+        categories = [Category.objects.get_or_create(name=f'{BENCH_CATEGORY} {n}')[0] for n in range(5)]
+        existing = Auction.objects.filter(category__in=categories).count()
+        missing = options['auctions'] - existing
+        if missing > 0:
+            self.stdout.write(f"Generando {missing} subastas sintéticas...")
+            with Stopwatch() as sw:
+                bulk_insert(Auction, synthetic_auctions(missing, categories, seed=existing),
+                            batch_size=options['batch_size'])
+            invalidate_index()
+            self.stdout.write(f"  {sw.elapsed:.1f}s")
+
+        backend = get_search_backend()
+        if isinstance(backend, InvertedIndexSearchBackend):
+            with Stopwatch() as sw:
+                backend.build()
+            self.stdout.write(f"Índice invertido en memoria construido en {sw.elapsed:.1f}s")
+
+        base = Auction.objects.filter(category__in=categories)
+        filtered = base.filter(category__name__iexact=categories[0].name, price__gte=100, price__lte=1000)
+        queries = options['queries'] or ['camiseta', 'camiseta firmada retro', 'guan', 'ref000123']
+        page_size = api_settings.PAGE_SIZE
+
+        def run(queryset):
+            # Lo mismo que hace la vista: COUNT(*) y la primera página
+            queryset.count()
+            return list(queryset[:page_size])
+
+        self.stdout.write(f"{'query':<26} {'filters':<8} {'icontains ms':>13} {'index ms':>10} {'speedup':>8}")
+        for text in queries:
+            for label, queryset in (('no', base), ('yes', filtered)):
+                icontains = queryset.filter(Q(title__icontains=text) | Q(description__icontains=text)).order_by('-created_at', '-id')
+                indexed = backend.search(queryset, text)
+                timings = {}
+                for name, qs in (('icontains', icontains), ('index', indexed)):
+                    samples = []
+                    for _ in range(options['repeat']):
+                        with Stopwatch() as sw:
+                            run(qs)
+                        samples.append(sw.elapsed * 1000)
+                    timings[name] = statistics.median(samples)
+                speedup = timings['icontains'] / timings['index'] if timings['index'] else float('inf')
+                self.stdout.write(f"{text:<26} {label:<8} {timings['icontains']:>13.1f} {timings['index']:>10.1f} {speedup:>7.1f}x")
@@ -0,0 +1,104 @@
+import asyncio
+import resource
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from auctions.benchmarks import Stopwatch, create_auction, percentile
+from auctions.broker import get_broker
+from auctions.services import place_bid
+
+
+class Subscriber:
+    """Cliente SSE falso que habla ASGI directamente con la aplicación de Django."""
+
+    def __init__(self, app, path, disconnect):
+        self.app = app
+        self.path = path
+        self.disconnect = disconnect
+        self.connected = asyncio.Event()
+        self.events = 0
+        self.waiters = []
+        self._sent_request = False
+
+    async def receive(self):
+        if not self._sent_request:
+            self._sent_request = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] != 'http.response.body':
+            return
+        body = message.get('body', b'')
+        if b'event: snapshot' in body:
+            self.connected.set()
+        self.events += body.count(b'event: bid')
+        for target, event in list(self.waiters):
+            if self.events >= target:
+                event.set()
+                self.waiters.remove((target, event))
+
+    async def wait_for_events(self, target):
+        if self.events >= target:
+            return
+        event = asyncio.Event()
+        self.waiters.append((target, event))
+        await event.wait()
+
+    async def run(self):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': self.path, 'raw_path': self.path.encode(),
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        await self.app(scope, self.receive, self.send)
+
+
+class Command(BaseCommand):
+    help = "Abre muchos suscriptores SSE concurrentes contra el stream de pujas y mide conexión, reparto y memoria."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=2000)
+        parser.add_argument('--bids', type=int, default=20)
+        parser.add_argument('--keep', action='store_true', help="No borrar la subasta al terminar.")
+
+    def handle(self, *args, **options):
+        from myFirstApiRest.asgi import application
+        auction = create_auction(title='Live auction (bench_sse)')
+        try:
+            asyncio.run(self.run(application, auction, options))
+        finally:
+            if not options['keep']:
+                auction.delete()
+
+    async def run(self, app, auction, options):
+        n = options['subscribers']
+        disconnect = asyncio.Event()
+        subscribers = [Subscriber(app, f'/api/auctions/{auction.pk}/bids/stream/', disconnect) for _ in range(n)]
+
+        # ru_maxrss está en KiB en Linux: es el pico de memoria del proceso
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with Stopwatch() as connect:
+            tasks = [asyncio.create_task(s.run()) for s in subscribers]
+            await asyncio.gather(*(s.connected.wait() for s in subscribers))
+        per_connection = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) * 1024 / n
+        self.stdout.write(f"subscribers:       {n} (broker: {get_broker().subscriber_count()})")
+        self.stdout.write(f"connect all:       {connect.elapsed:.2f}s")
+        self.stdout.write(f"memory/connection: {per_connection / 1024:.1f} KiB")
+
+        latencies = []
+        for i in range(1, options['bids'] + 1):
+            with Stopwatch() as fan_out:
+                await sync_to_async(place_bid)(auction.pk, Decimal(i + 1), f'bench-{i}')
+                await asyncio.gather(*(s.wait_for_events(i) for s in subscribers))
+            latencies.append(fan_out.elapsed * 1000)
+        delivered = sum(s.events for s in subscribers)
+        self.stdout.write(f"bids:              {options['bids']}, events delivered {delivered}/{n * options['bids']}")
+        self.stdout.write(f"fan-out p50/p95:   {percentile(latencies, 50):.1f} / {percentile(latencies, 95):.1f} ms "
+                          f"(bid commit + delivery to every subscriber)")
+
+        disconnect.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.stdout.write(f"after disconnect:  {get_broker().subscriber_count()} subscribers left")
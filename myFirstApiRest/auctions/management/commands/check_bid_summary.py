@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from auctions import cache
+from auctions.models import Auction
+from auctions.services import bid_summary_drift, rebuild_bid_summary, version_bump
+
+
+class Command(BaseCommand):
+    help = (
+        "Comprueba que current_bid, bid_count y last_bid_at de las subastas coinciden con la tabla Bid "
+        "y, con --repair, recalcula en bloque las que no coinciden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help="Corregir las subastas con diferencias.")
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Subastas por consulta (por rango de id) para no bloquear la tabla entera.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Auction.objects.aggregate(last=Max('id'))['last'] or 0
+        drifted = 0
+        for start in range(0, last_id + 1, batch_size):
+            batch = Auction.objects.filter(id__gte=start, id__lt=start + batch_size)
+            ids = list(bid_summary_drift(batch).values_list('pk', flat=True))
+            drifted += len(ids)
+            if ids and options['repair']:
+                self.repair(ids)
+            if ids and options['verbosity'] > 1:
+                self.stdout.write(f"  ids {start}-{start + batch_size - 1}: {ids}")
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("El resumen de pujas coincide en todas las subastas."))
+        elif options['repair']:
+            self.stdout.write(self.style.SUCCESS(f"Resumen de pujas recalculado en {drifted} subastas."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{drifted} subastas con el resumen de pujas desfasado "
+                                                 f"(usa --repair para corregirlas)."))
+
+    @transaction.atomic
+    def repair(self, ids):
+        auctions = Auction.objects.filter(pk__in=ids)
+        rebuild_bid_summary(auctions)
+        # La respuesta cambia: nuevo ETag y fuera de la caché
+        auctions.update(**version_bump())
+        for auction_id in ids:
+            cache.invalidate(f'auction:{auction_id}')
@@ -0,0 +1,39 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from auctions.services import finalize_expired_auctions
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker que cierra las subastas vencidas y guarda la puja ganadora y el precio final. "
+        "Se pueden lanzar varios a la vez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=float, default=10.0,
+                            help="Segundos de espera cuando no quedan subastas por cerrar.")
+        parser.add_argument('--once', action='store_true',
+                            help="Cerrar todas las subastas vencidas y terminar (p. ej. desde cron).")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                finalized = finalize_expired_auctions(batch_size=options['batch_size'])
+                total += finalized
+                if finalized:
+                    logger.info("%d subastas cerradas", finalized)
+                    continue
+                if options['once']:
+                    break
+                # Conexión fresca en cada vuelta (CONN_MAX_AGE, caídas de la base de datos)
+                close_old_connections()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"{total} subastas cerradas")
@@ -0,0 +1,156 @@
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from auctions.benchmarks import create_auction
+from auctions.models import Auction, Bid, Comment, Rating
+from auctions.services import _open_auctions
+from users.models import CustomUser
+
+# (nombre, url, necesita usuario, tablas que el endpoint lee enteras a propósito)
+ENDPOINTS = (
+    ('category-list', '/api/auctions/categories/', False, ('auctions_category',)),
+    ('auction-list', '/api/auctions/', False, ()),
+    ('auction-list-cursor', '/api/auctions/?pagination=cursor', False, ()),
+    ('auction-list-open', '/api/auctions/?open=true', False, ()),
+    ('auction-list-closed', '/api/auctions/?open=false', False, ()),
+    ('auction-list-ids', '/api/auctions/?ids={auction}', False, ()),
+    ('auction-search-price', '/api/auctions/search/?priceMin=1&priceMax=50', False, ()),
+    ('auction-search-category', '/api/auctions/search/?category={category}&priceMax=50', False, ()),
+    ('auction-search-text', '/api/auctions/search/?description=explain', False, ()),
+    ('auction-search-facets', '/api/auctions/search/?category={category}&priceMax=50&facets=true', False, ()),
+    ('auction-detail', '/api/auctions/{auction}/', False, ()),
+    ('user-auctions', '/api/auctions/users/', True, ()),
+    ('auction-bids', '/api/auctions/{auction}/bids/', False, ()),
+    ('auction-comments', '/api/auctions/{auction}/comments/', False, ()),
+    ('rating-list', '/api/auctions/ratings/', True, ('auctions_rating',)),
+    ('user-profile', '/api/users/profile/', True, ()),
+)
+
+# Sin caché, para que cada petición llegue a la base de datos
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class QueryCollector:
+    """execute_wrapper que guarda el SQL y los parámetros de cada consulta."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas de cada endpoint de lectura y marca los "
+        "recorridos secuenciales de tablas. Sale con error si encuentra alguno (para CI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help="Mostrar el plan completo de cada consulta.")
+        parser.add_argument('--report-only', action='store_true', help="No fallar aunque haya recorridos secuenciales.")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f"EXPLAIN no soportado para {connection.vendor}.")
+
+        problems = []
+        # Los datos de prueba se crean dentro de una transacción que se deshace al final
+        with transaction.atomic(), override_settings(CACHES=NO_CACHE):
+            if connection.vendor == 'postgresql':
+                # Con tablas pequeñas el planificador prefiere Seq Scan aunque haya índice.
+                # Así solo aparece un Seq Scan cuando ningún índice sirve.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            fixtures = self.create_fixtures()
+            user_client = APIClient(SERVER_NAME='localhost')
+            user_client.force_authenticate(fixtures['user'])
+            anonymous_client = APIClient(SERVER_NAME='localhost')
+
+            for name, url, needs_user, allowed in ENDPOINTS:
+                client = user_client if needs_user else anonymous_client
+                url = url.format(auction=fixtures['auction'].pk, category=fixtures['auction'].category.name)
+                client.get(url)  # calentamiento (índice de búsqueda en memoria, etc.)
+                queries = QueryCollector()
+                with connection.execute_wrapper(queries):
+                    response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"{name}: GET {url} devolvió {response.status_code}")
+                problems += self.explain(name, queries.queries, allowed, options['verbose_plans'])
+
+            # Consultas que no son de un GET pero están en caminos calientes
+            now = timezone.now()
+            for name, queryset in (
+                ('validate-email', CustomUser.objects.filter(email=fixtures['user'].email).exclude(pk=fixtures['user'].pk)),
+                ('open-auctions', _open_auctions(now).filter(closed_at__lte=now + timedelta(days=1))),
+                ('pending-close', Auction.objects.filter(finalized_at__isnull=True, closed_at__lte=now)
+                 .order_by('closed_at', 'id')),
+            ):
+                sql, params = queryset.query.sql_with_params()
+                problems += self.explain(name, [(sql, params)], (), options['verbose_plans'])
+
+            transaction.set_rollback(True)
+
+        if problems:
+            self.stdout.write(self.style.WARNING(f"{len(problems)} recorrido(s) secuencial(es):"))
+            for name, table, sql in problems:
+                self.stdout.write(f"  {name}: {table}\n    {sql[:300]}")
+            if not options['report_only']:
+                raise CommandError("Hay consultas sin índice.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Ninguna consulta recorre una tabla entera."))
+
+    def create_fixtures(self):
+        user = CustomUser.objects.create_user(
+            username='explain-endpoints', email='explain@example.com',
+            password='explain-pass-123', birth_date=date(1990, 1, 1),
+        )
+        auction = create_auction(title='Explain auction', description='explain', auctioneer=user)
+        Bid.objects.create(auction=auction, price=Decimal('2.00'), bidder='explain')
+        Rating.objects.create(auction=auction, user=user, value=Decimal('4.00'))
+        today = date.today()
+        Comment.objects.create(title='explain', text='explain', creation_date=today,
+                               modification_date=today, user=user, auction=auction)
+        return {'user': user, 'auction': auction}
+
+    def explain(self, name, queries, allowed, verbose):
+        problems = []
+        seen = set()
+        for sql, params in queries:
+            if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                continue
+            seen.add(sql)
+            plan = self.plan(sql, params)
+            if verbose:
+                self.stdout.write(f"-- {name}\n{sql}\n" + '\n'.join(f'   {line}' for line in plan))
+            for line in plan:
+                table = self.scanned_table(line)
+                if table and table not in allowed:
+                    problems.append((name, table, sql))
+        status = self.style.ERROR('SCAN') if problems else self.style.SUCCESS('ok')
+        self.stdout.write(f"{name:<26} {len(seen):>3} consultas  {status}")
+        return problems
+
+    def plan(self, sql, params):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('EXPLAIN ' + sql, params)
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def scanned_table(self, line):
+        if connection.vendor == 'postgresql':
+            match = POSTGRES_SCAN.search(line)
+        else:
+            match = SQLITE_SCAN.match(line.strip())
+        return match.group(1) if match else None
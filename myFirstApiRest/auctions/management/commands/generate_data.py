@@ -0,0 +1,128 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from auctions.benchmarks import WORDS, Stopwatch, bulk_insert, synthetic_auctions
+from auctions.models import Auction, Bid, Category, Comment, Rating
+from auctions.search import invalidate_index
+from auctions.services import rebuild_bid_summary
+from users.models import CustomUser
+
+USER_PREFIX = 'gen-user-'
+CATEGORY_PREFIX = 'Categoría '
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos (usuarios, categorías, subastas con sus pujas, valoraciones y "
+        "comentarios) con bulk_create por lotes. Los agregados de cada subasta (precio actual, "
+        "rating_sum, rating_count) quedan coherentes con las filas generadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--auctions', type=int, default=100_000)
+        parser.add_argument('--max-bids', type=int, default=20, help="Pujas por subasta: entre 0 y este valor.")
+        parser.add_argument('--max-ratings', type=int, default=5)
+        parser.add_argument('--max-comments', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+
+        with Stopwatch() as sw:
+            users = self.create_users(options['users'], batch_size)
+            categories = [Category.objects.get_or_create(name=f'{CATEGORY_PREFIX}{n}')[0]
+                          for n in range(options['categories'])]
+        self.stdout.write(f"{len(users)} usuarios y {len(categories)} categorías en {sw.elapsed:.1f}s")
+        user_ids = [user.pk for user in users]
+
+        remaining = options['auctions']
+        # Semilla distinta en cada ejecución para no repetir las mismas subastas
+        seed = options['seed'] + Auction.objects.count()
+        generated = synthetic_auctions(remaining, categories, auctioneers=users, seed=seed)
+        totals = {'auctions': 0, 'bids': 0, 'ratings': 0, 'comments': 0}
+        start = time.perf_counter()
+        while remaining > 0:
+            chunk = [next(generated) for _ in range(min(batch_size, remaining))]
+            remaining -= len(chunk)
+            counts = self.insert_chunk(chunk, users, user_ids, rng, options)
+            for key, value in counts.items():
+                totals[key] += value
+            self.stdout.write(
+                f"  {totals['auctions']} subastas, {totals['bids']} pujas, "
+                f"{totals['ratings']} valoraciones, {totals['comments']} comentarios "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Datos generados en {time.perf_counter() - start:.1f}s"))
+
+    def create_users(self, count, batch_size):
+        existing = list(CustomUser.objects.filter(username__startswith=USER_PREFIX))
+        missing = count - len(existing)
+        if missing > 0:
+            # Un solo hash para todos: hashear millones de contraseñas no aporta nada aquí
+            password = make_password('gen-pass-123')
+            start = len(existing)
+            bulk_insert(CustomUser, (
+                CustomUser(username=f'{USER_PREFIX}{n}', email=f'{USER_PREFIX}{n}@example.com',
+                           password=password, birth_date=date(1990, 1, 1) + timedelta(days=n % 10000))
+                for n in range(start, start + missing)
+            ), batch_size=batch_size)
+            existing = list(CustomUser.objects.filter(username__startswith=USER_PREFIX))
+        return existing[:count]
+
+    @transaction.atomic
+    def insert_chunk(self, auctions, users, user_ids, rng, options):
+        children = []
+        today = date.today()
+        for auction in auctions:
+            # Pujas crecientes a partir del precio de salida
+            price = auction.price
+            auction_bids = []
+            for _ in range(rng.randint(0, options['max_bids'])):
+                price += Decimal(rng.randint(1, 5000)) / 100
+                auction_bids.append(Bid(price=price, bidder=rng.choice(users).username))
+
+            raters = rng.sample(user_ids, min(rng.randint(0, options['max_ratings']), len(user_ids)))
+            auction_ratings = [Rating(user_id=user_id, value=Decimal(rng.randint(100, 500)) / 100) for user_id in raters]
+            auction.rating_sum = sum((rating.value for rating in auction_ratings), Decimal('0'))
+            auction.rating_count = len(auction_ratings)
+
+            auction_comments = []
+            for _ in range(rng.randint(0, options['max_comments'])):
+                day = today - timedelta(days=rng.randint(0, 30))
+                auction_comments.append(Comment(
+                    title=' '.join(rng.choices(WORDS, k=3)).capitalize(),
+                    text=' '.join(rng.choices(WORDS, k=rng.randint(5, 30))),
+                    creation_date=day, modification_date=day, user_id=rng.choice(user_ids),
+                ))
+            children.append((auction_bids, auction_ratings, auction_comments))
+
+        # bulk_create rellena los pk (PostgreSQL y SQLite >= 3.35) para enlazar los hijos
+        Auction.objects.bulk_create(auctions)
+        # bulk_create no envía post_save: el índice de búsqueda en memoria no las ve
+        invalidate_index()
+        bids, ratings, comments = [], [], []
+        for auction, (auction_bids, auction_ratings, auction_comments) in zip(auctions, children):
+            for obj in auction_bids + auction_ratings + auction_comments:
+                obj.auction_id = auction.pk
+            bids += auction_bids
+            ratings += auction_ratings
+            comments += auction_comments
+
+        batch_size = options['batch_size']
+        counts = {
+            'auctions': len(auctions),
+            'bids': bulk_insert(Bid, bids, batch_size=batch_size),
+            'ratings': bulk_insert(Rating, ratings, batch_size=batch_size),
+            'comments': bulk_insert(Comment, comments, batch_size=batch_size),
+        }
+        # last_bid_at depende de la fecha que pone la base de datos al insertar las pujas
+        rebuild_bid_summary(Auction.objects.filter(pk__in=[auction.pk for auction in auctions]))
+        return counts
@@ -0,0 +1,73 @@
+import csv
+import sys
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from auctions.models import Auction
+from auctions.services import import_ratings
+from users.models import CustomUser
+
+MIN_VALUE, MAX_VALUE = Decimal('1'), Decimal('5')
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa valoraciones desde un CSV con columnas auction,user,value (ids y valor de 1 a 5). "
+        "Las que ya existen cambian de valor; los agregados de las subastas se recalculan por lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichero CSV ('-' para la entrada estándar).")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Filas por transacción (y por INSERT ... ON CONFLICT).")
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.load(sys.stdin, options['batch_size'])
+        else:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                self.load(f, options['batch_size'])
+
+    def load(self, f, batch_size):
+        reader = csv.DictReader(f)
+        missing = {'auction', 'user', 'value'} - set(reader.fieldnames or ())
+        if missing:
+            raise CommandError(f"Faltan columnas en el CSV: {', '.join(sorted(missing))}")
+
+        written, skipped, chunk = 0, 0, []
+        for line, row in enumerate(reader, 2):
+            item = self.parse(line, row)
+            if item is None:
+                skipped += 1
+                continue
+            chunk.append((line, item))
+            if len(chunk) >= batch_size:
+                count, rejected = self.write(chunk, batch_size)
+                written, skipped, chunk = written + count, skipped + rejected, []
+        if chunk:
+            count, rejected = self.write(chunk, batch_size)
+            written, skipped = written + count, skipped + rejected
+        self.stdout.write(self.style.SUCCESS(f"{written} valoraciones importadas, {skipped} filas descartadas."))
+
+    def parse(self, line, row):
+        try:
+            item = {'auction': int(row['auction']), 'user': int(row['user']),
+                    'value': Decimal(row['value']).quantize(Decimal('0.01'))}
+        except (TypeError, ValueError, InvalidOperation):
+            self.stderr.write(f"línea {line}: fila no válida {row}")
+            return None
+        if not MIN_VALUE <= item['value'] <= MAX_VALUE:
+            self.stderr.write(f"línea {line}: el valor debe estar entre {MIN_VALUE} y {MAX_VALUE}")
+            return None
+        return item
+
+    def write(self, chunk, batch_size):
+        # Las claves ajenas se comprueban antes: un id inexistente haría fallar el lote entero
+        auctions = set(Auction.objects.filter(pk__in={item['auction'] for _, item in chunk}).values_list('pk', flat=True))
+        users = set(CustomUser.objects.filter(pk__in={item['user'] for _, item in chunk}).values_list('pk', flat=True))
+        valid = []
+        for line, item in chunk:
+            if item['auction'] in auctions and item['user'] in users:
+                valid.append(item)
+            else:
+                self.stderr.write(f"línea {line}: la subasta {item['auction']} o el usuario {item['user']} no existe")
+        return import_ratings(valid, batch_size=batch_size), len(chunk) - len(valid)
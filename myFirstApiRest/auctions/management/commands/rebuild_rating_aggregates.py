@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from auctions import cache
+from auctions.models import Auction
+from auctions.services import rebuild_rating_aggregates, version_bump
+
+
+class Command(BaseCommand):
+    help = "Recalcula en bloque rating_sum y rating_count de las subastas a partir de la tabla Rating."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Subastas por UPDATE (por rango de id) para no bloquear la tabla entera.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Auction.objects.aggregate(last=Max('id'))['last'] or 0
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            with transaction.atomic():
+                batch = Auction.objects.filter(id__gte=start, id__lt=start + batch_size)
+                # La respuesta puede cambiar: nuevo ETag y fuera de la caché
+                updated += rebuild_rating_aggregates(batch, **version_bump())
+                for auction_id in batch.values_list('pk', flat=True):
+                    cache.invalidate(f'auction:{auction_id}')
+        self.stdout.write(self.style.SUCCESS(f"Agregados de valoración recalculados en {updated} subastas."))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 08:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0004_alter_rating_auction_alter_rating_user_comment"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auction",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="auction_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(
+                fields=["auction", "-price", "-creation_date"],
+                name="bid_auction_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["auction", "creation_date", "id"],
+                name="comment_auction_date_idx",
+            ),
+        ),
+    ]
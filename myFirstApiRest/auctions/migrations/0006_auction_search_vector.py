@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-18 08:28
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# El vector solo se mantiene en PostgreSQL; en SQLite la columna queda a NULL
+# y AuctionSearch usa el índice invertido en memoria (auctions/search.py).
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION auctions_auction_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER auctions_auction_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON auctions_auction
+    FOR EACH ROW EXECUTE FUNCTION auctions_auction_search_vector_update();
+
+UPDATE auctions_auction SET search_vector =
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B');
+
+CREATE INDEX auction_search_gin ON auctions_auction USING GIN (search_vector);
+"""
+
+DROP_TRIGGER = """
+DROP INDEX IF EXISTS auction_search_gin;
+DROP TRIGGER IF EXISTS auctions_auction_search_vector_trigger ON auctions_auction;
+DROP FUNCTION IF EXISTS auctions_auction_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0005_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auction",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
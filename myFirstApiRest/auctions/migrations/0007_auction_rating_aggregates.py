@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 08:29
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Auction = apps.get_model("auctions", "Auction")
+    Rating = apps.get_model("auctions", "Rating")
+    ratings = Rating.objects.filter(auction=OuterRef("pk")).order_by().values("auction")
+    Auction.objects.update(
+        rating_sum=Coalesce(
+            Subquery(ratings.annotate(total=Sum("value")).values("total")),
+            Value(Decimal("0")),
+        ),
+        rating_count=Coalesce(
+            Subquery(ratings.annotate(total=Count("id")).values("total")),
+            Value(0),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0006_auction_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auction",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="auction",
+            name="rating_sum",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
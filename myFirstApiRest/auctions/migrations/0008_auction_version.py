@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0007_auction_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auction",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="auction",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
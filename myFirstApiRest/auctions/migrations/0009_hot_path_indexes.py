@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 08:38
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0008_auction_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auction",
+            index=models.Index(fields=["price"], name="auction_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auction",
+            index=models.Index(
+                fields=["category", "price"], name="auction_category_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auction",
+            index=models.Index(fields=["closed_at"], name="auction_closed_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                django.db.models.functions.text.Upper("name"),
+                name="category_name_upper_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 08:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0009_hot_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auction",
+            name="final_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="auction",
+            name="finalized_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="auction",
+            name="winning_bid",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="auctions.bid",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auction",
+            index=models.Index(
+                condition=models.Q(("finalized_at__isnull", True)),
+                fields=["closed_at", "id"],
+                name="auction_pending_close_idx",
+            ),
+        ),
+    ]
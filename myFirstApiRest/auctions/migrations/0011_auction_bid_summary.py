@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-18 09:13
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_bid_summary(apps, schema_editor):
+    """
+    Rellena current_bid, bid_count y last_bid_at a partir de Bid.
+
+    Auction.price no se toca. Antes de esta migración cada puja mayor que
+    price lo sobrescribía y el precio de salida no se guardaba en ningún otro
+    sitio, así que no se puede recuperar: en las subastas existentes cuya puja
+    más alta superó el precio de salida, price queda con esa puja
+    (price == current_bid). En las demás (sin pujas o con pujas menores) price
+    sigue siendo el precio de salida.
+    """
+    Auction = apps.get_model("auctions", "Auction")
+    Bid = apps.get_model("auctions", "Bid")
+    bids = Bid.objects.filter(auction=OuterRef("pk")).order_by().values("auction")
+    Auction.objects.update(
+        current_bid=Subquery(
+            Bid.objects.filter(auction=OuterRef("pk")).order_by("-price").values("price")[:1]
+        ),
+        bid_count=Coalesce(
+            Subquery(bids.annotate(total=Count("id")).values("total")),
+            Value(0),
+        ),
+        last_bid_at=Subquery(bids.annotate(last=Max("creation_date")).values("last")),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0010_auction_winner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auction",
+            name="bid_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="auction",
+            name="current_bid",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="auction",
+            name="last_bid_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_bid_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0011_auction_bid_summary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(
+                fields=["auction", "-creation_date", "-id"],
+                name="bid_auction_created_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import CustomUser 
 
@@ -8,16 +10,47 @@ class Category(models.Model):
 
     class Meta:
         ordering=('id',)
+        indexes = [
+            # AuctionSearch filtra con category__name__iexact (UPPER(name) en PostgreSQL)
+            models.Index(Upper('name'), name='category_name_upper_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+class AuctionQuerySet(models.QuerySet):
+    """Abierta = sin fecha de cierre o con cierre posterior a `now`."""
+
+    def open(self, now):
+        return self.filter(models.Q(closed_at__isnull=True) | models.Q(closed_at__gt=now))
+
+    def closed(self, now):
+        return self.filter(closed_at__lte=now)
+
+    def with_is_open(self, now):
+        return self.annotate(is_open=models.ExpressionWrapper(
+            models.Q(closed_at__isnull=True) | models.Q(closed_at__gt=now),
+            output_field=models.BooleanField(),
+        ))
+
+    def with_top_bid(self):
+        """Anota top_bid_id, top_bid_price y top_bid_bidder (la puja más alta) en la misma consulta."""
+        top = Bid.objects.filter(auction=models.OuterRef('pk')).order_by('-price', '-creation_date')
+        return self.annotate(
+            top_bid_id=models.Subquery(top.values('pk')[:1]),
+            top_bid_price=models.Subquery(top.values('price')[:1]),
+            top_bid_bidder=models.Subquery(top.values('bidder')[:1]),
+        )
+
+
 class Auction(models.Model):
     title = models.CharField(max_length=150)
     description = models.TextField()
     closed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)  
     thumbnail = models.URLField()
+    # Precio de salida; la puja más alta va en current_bid. En subastas anteriores a
+    # la migración 0011 puede ser la puja más alta (ver backfill_bid_summary)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField(validators=[MinValueValidator(1)])
     rating = models.DecimalField(max_digits=3, decimal_places=2, validators=[MinValueValidator(1), MaxValueValidator(5)])
@@ -29,6 +62,43 @@ class Auction(models.Model):
         on_delete=models.CASCADE,  # Si el usuario es eliminado, se eliminan las subastas
         null=True
     )
+    # Versión para ETag: se incrementa con cada cambio de la subasta, sus pujas,
+    # comentarios o valoraciones (auctions.services.touch_auction)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Agregados de Rating, mantenidos por auctions.services (media = suma / número)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # Resumen de las pujas (la más alta, cuántas hay y la fecha de la última),
+    # mantenido por auctions.services en la misma transacción que la puja
+    current_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    bid_count = models.PositiveIntegerField(default=0)
+    last_bid_at = models.DateTimeField(null=True, blank=True)
+    # Vector de búsqueda (título con peso A, descripción con peso B). En
+    # PostgreSQL lo mantiene un trigger; en otros motores queda a NULL.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Resultado de la subasta, lo rellena el comando close_auctions al pasar
+    # closed_at (auctions.services.finalize_expired_auctions)
+    winning_bid = models.ForeignKey('Bid', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    final_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    finalized_at = models.DateTimeField(null=True, blank=True)
+
+    objects = AuctionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Orden de la paginación por cursor de AuctionListCreate y AuctionSearch
+            models.Index(fields=['-created_at', '-id'], name='auction_created_idx'),
+            # Filtros priceMin/priceMax de AuctionSearch, solos o junto a la categoría
+            models.Index(fields=['price'], name='auction_price_idx'),
+            models.Index(fields=['category', 'price'], name='auction_category_price_idx'),
+            # Subastas abiertas/cerradas
+            models.Index(fields=['closed_at'], name='auction_closed_at_idx'),
+            # Subastas vencidas pendientes de cerrar (índice parcial, solo las no finalizadas)
+            models.Index(fields=['closed_at', 'id'], name='auction_pending_close_idx',
+                         condition=models.Q(finalized_at__isnull=True)),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -40,6 +110,11 @@ class Bid(models.Model):
 
     class Meta:
         ordering=('-price','-creation_date')
+        indexes = [
+            models.Index(fields=['auction', '-price', '-creation_date'], name='bid_auction_price_idx'),
+            # Paginación por cursor: creation_date e id no cambian aunque la puja suba de precio
+            models.Index(fields=['auction', '-creation_date', '-id'], name='bid_auction_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.bidder} - {self.price}€"
@@ -59,4 +134,9 @@ class Comment(models.Model):
     creation_date = models.DateField()
     modification_date = models.DateField()
     user = models.ForeignKey(CustomUser,on_delete=models.CASCADE)
-    auction = models.ForeignKey(Auction,on_delete=models.CASCADE )
\ No newline at end of file
+    auction = models.ForeignKey(Auction,on_delete=models.CASCADE )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['auction', 'creation_date', 'id'], name='comment_auction_date_idx'),
+        ]
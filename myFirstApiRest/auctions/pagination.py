@@ -0,0 +1,68 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Paginación keyset: en vez de COUNT(*) + OFFSET filtra por la posición del
+    último elemento, así la página 1000 cuesta lo mismo que la primera.
+    El orden lo define la vista con `cursor_ordering` y debe tener un índice
+    compuesto que lo respalde.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Paginación por defecto del API. Los clientes siguen recibiendo el formato
+    de PageNumberPagination salvo que pidan ?pagination=cursor (o envíen un
+    ?cursor=...) en una vista que declare `cursor_ordering`.
+    """
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def wants_cursor(self, request, view):
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        params = request.query_params
+        return params.get(self.mode_query_param) == 'cursor' or self.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request, view):
+            self.cursor_paginator = KeysetCursorPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'cursor_ordering', None):
+            parameters += [
+                {
+                    'name': self.mode_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': "Usa 'cursor' para paginación keyset.",
+                    'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+                },
+                {
+                    'name': self.cursor_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': 'Cursor devuelto en next/previous.',
+                    'schema': {'type': 'string'},
+                },
+            ]
+        return parameters
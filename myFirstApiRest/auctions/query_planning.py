@@ -0,0 +1,126 @@
+"""
+Planificación de consultas a partir de los serializers.
+
+Cada serializer describe qué columnas y relaciones lee: la mayoría se deduce
+de sus campos (`source`) y el resto se declara en su Meta:
+
+    class Meta:
+        model = Auction
+        extra_columns = ('closed_at',)          # columnas que leen los SerializerMethodField
+        select_related = ('category',)          # relaciones que se recorren a mano
+        prefetch_related = ('bids',)
+
+extra_columns también puede ser un dict {campo: columnas}: así las columnas
+solo se leen si el campo sigue en el serializer (ver myFirstApiRest.fieldsets).
+
+optimize_queryset() traduce eso a select_related / prefetch_related / only()
+para que el número de consultas de un listado no crezca con el tamaño de la página.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+class QueryPlan:
+    def __init__(self):
+        self.columns = set()
+        self.select_related = set()
+        self.prefetch_related = set()
+        # Si algún campo lee algo que no es una columna no podemos usar only()
+        self.restrict_columns = True
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch_related))
+        if self.restrict_columns and self.columns:
+            queryset = queryset.only(*sorted(self.columns))
+        return queryset
+
+
+def _plan_field(plan, model, field):
+    if field.write_only:
+        return
+    if field.source == '*':
+        # SerializerMethodField y similares: sus columnas van en Meta.extra_columns
+        return
+    attrs = field.source_attrs
+    try:
+        model_field = model._meta.get_field(attrs[0])
+    except FieldDoesNotExist:
+        plan.restrict_columns = False
+        return
+
+    if model_field.many_to_many or model_field.one_to_many:
+        plan.prefetch_related.add(model_field.name)
+        return
+    if not model_field.concrete:
+        plan.restrict_columns = False
+        return
+
+    plan.columns.add(model_field.name)
+    if not model_field.is_relation:
+        return
+
+    child = field.child_relation if isinstance(field, ManyRelatedField) else field
+    if len(attrs) == 1 and isinstance(child, RelatedField) and child.use_pk_only_optimization():
+        # Basta con la FK (category_id), no hace falta cargar el objeto relacionado
+        return
+    plan.select_related.add(model_field.name)
+    if len(attrs) == 2:
+        plan.columns.add(f'{attrs[0]}__{attrs[1]}')
+    else:
+        # Serializer anidado o relación que usa el objeto entero
+        plan.restrict_columns = False
+
+
+def plan_for(serializer):
+    """Construye el QueryPlan de una instancia de serializer (o de su hijo si many=True)."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    meta = getattr(serializer, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    plan = QueryPlan()
+    if model is None:
+        plan.restrict_columns = False
+        return plan
+
+    plan.columns.add(model._meta.pk.name)
+    for field in serializer.fields.values():
+        _plan_field(plan, model, field)
+    extra_columns = getattr(meta, 'extra_columns', ())
+    if isinstance(extra_columns, dict):
+        for name, columns in extra_columns.items():
+            if name in serializer.fields:
+                plan.columns.update(columns)
+    else:
+        plan.columns.update(extra_columns)
+    plan.select_related.update(getattr(meta, 'select_related', ()))
+    plan.prefetch_related.update(getattr(meta, 'prefetch_related', ()))
+    return plan
+
+
+def optimize_queryset(queryset, serializer):
+    """Acepta una clase o una instancia de serializer."""
+    if isinstance(serializer, type):
+        serializer = serializer()
+    return plan_for(serializer).apply(queryset)
+
+
+class OptimizedQuerysetMixin:
+    """
+    Para vistas genéricas: en lecturas (GET/HEAD/OPTIONS) el queryset se
+    optimiza según el serializer de la vista. En escrituras se deja intacto
+    para que save() y las validaciones vean el objeto completo.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            plan = plan_for(self.get_serializer())
+            # La paginación por cursor lee las columnas de ordenación de la última fila
+            plan.columns.update(field.lstrip('-') for field in getattr(self, 'cursor_ordering', ()))
+            queryset = plan.apply(queryset)
+        return queryset
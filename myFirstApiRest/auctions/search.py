@@ -0,0 +1,226 @@
+"""
+Búsqueda de texto de AuctionSearch.
+
+En PostgreSQL se usa la columna precalculada Auction.search_vector (mantenida
+por un trigger, ver migración 0006) con un índice GIN y ranking con ts_rank.
+En el resto de motores (SQLite en desarrollo y tests) se usa un índice
+invertido en memoria que se mantiene con las señales de Auction.
+
+El índice en memoria devuelve como mucho AUCTION_SEARCH_FALLBACK_LIMIT
+subastas (las más relevantes): cuando hay más coincidencias, count y las
+páginas cubren solo esas y la respuesta lleva la cabecera X-Search-Truncated
+con el límite. Las cargas masivas (bulk_create no envía señales) llaman a
+invalidate_index(); cada proceso reconstruye su índice en la siguiente
+búsqueda al ver la nueva generación del espacio 'auction-search' de la caché.
+"""
+import bisect
+import heapq
+import re
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache.backends.dummy import DummyCache
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+from . import cache
+
+
+# Debe coincidir con la configuración usada por el trigger de la migración 0006
+SEARCH_CONFIG = 'simple'
+
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TERM_RE = re.compile(r'[^\W_]+')
+
+INDEX_NAMESPACE = 'auction-search'
+TRUNCATED_HEADER = 'X-Search-Truncated'
+
+
+def search_terms(text):
+    return _TERM_RE.findall(text.lower())
+
+
+class PostgresSearchBackend:
+    """tsvector + GIN. Cada término se busca como prefijo para soportar búsqueda mientras se escribe."""
+
+    def search(self, queryset, text, request=None):
+        terms = search_terms(text)
+        if not terms:
+            return queryset
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+        return (queryset
+                .filter(search_vector=query)
+                .annotate(rank=SearchRank(F('search_vector'), query))
+                .order_by('-rank', '-created_at', '-id'))
+
+
+class InvertedIndexSearchBackend:
+    """
+    Índice invertido en memoria (término -> {auction_id: peso}). Se construye
+    la primera vez que se busca y después se actualiza de forma incremental
+    desde las señales post_save/post_delete de Auction; invalidate_index()
+    obliga a reconstruirlo.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit or getattr(settings, 'AUCTION_SEARCH_FALLBACK_LIMIT', 1000)
+        self._lock = threading.Lock()
+        self._postings = None
+        self._documents = {}
+        self._sorted_terms = []
+        self._terms_dirty = False
+        self._generation = None
+
+    @property
+    def ready(self):
+        return self._postings is not None
+
+    def _document(self, title, description):
+        weights = defaultdict(float)
+        for term in search_terms(title or ''):
+            weights[term] += TITLE_WEIGHT
+        for term in search_terms(description or ''):
+            weights[term] += DESCRIPTION_WEIGHT
+        return weights
+
+    def _add(self, pk, title, description):
+        document = self._document(title, description)
+        self._documents[pk] = document
+        for term, weight in document.items():
+            if term not in self._postings:
+                self._terms_dirty = True
+            self._postings[term][pk] = weight
+
+    def _remove(self, pk):
+        for term in self._documents.pop(pk, {}):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+
+    def build(self):
+        from .models import Auction
+        generation = _index_generation()
+        with self._lock:
+            self._generation = generation
+            self._postings = defaultdict(dict)
+            self._documents = {}
+            rows = Auction.objects.values_list('id', 'title', 'description').iterator(chunk_size=2000)
+            for pk, title, description in rows:
+                self._add(pk, title, description)
+            self._terms_dirty = True
+
+    def index(self, auction):
+        if not self.ready:
+            return
+        with self._lock:
+            self._remove(auction.pk)
+            self._add(auction.pk, auction.title, auction.description)
+
+    def unindex(self, pk):
+        if not self.ready:
+            return
+        with self._lock:
+            self._remove(pk)
+
+    def _expand(self, prefix):
+        if self._terms_dirty:
+            self._sorted_terms = sorted(self._postings)
+            self._terms_dirty = False
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def ranked_ids(self, text, candidates=None):
+        """
+        Ids que contienen todos los términos (como prefijo), ordenados por
+        relevancia, y el número total de coincidencias. `candidates` restringe
+        el resultado a esos ids antes de aplicar el límite.
+        """
+        if not self.ready or self._generation != _index_generation():
+            self.build()
+        terms = search_terms(text)
+        with self._lock:
+            scores = None
+            for prefix in terms:
+                matches = defaultdict(float)
+                for term in self._expand(prefix):
+                    for pk, weight in self._postings[term].items():
+                        matches[pk] = max(matches[pk], weight)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {pk: score + matches[pk] for pk, score in scores.items() if pk in matches}
+                if not scores:
+                    return [], 0
+        if candidates is not None:
+            scores = {pk: score for pk, score in scores.items() if pk in candidates}
+        return heapq.nlargest(self.limit, scores.items(), key=lambda item: (item[1], item[0])), len(scores)
+
+    def search(self, queryset, text, request=None):
+        if not search_terms(text):
+            return queryset
+        candidates = None
+        if queryset.query.where:
+            # Con filtros (categoría, precio...) el límite se aplica después de filtrar
+            candidates = set(queryset.values_list('pk', flat=True))
+        ranked, total = self.ranked_ids(text, candidates)
+        if total > len(ranked) and request is not None:
+            # La vista lo publica en la cabecera X-Search-Truncated
+            getattr(request, '_request', request).auctions_search_limit = self.limit
+        if not ranked:
+            return queryset.none()
+        rank = Case(*[When(pk=pk, then=Value(score)) for pk, score in ranked], output_field=FloatField())
+        return (queryset
+                .filter(pk__in=[pk for pk, _ in ranked])
+                .annotate(rank=rank)
+                .order_by('-rank', '-created_at', '-id'))
+
+
+_fallback_backend = None
+
+
+def get_search_backend():
+    global _fallback_backend
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if _fallback_backend is None:
+        _fallback_backend = InvertedIndexSearchBackend()
+    return _fallback_backend
+
+
+def _index_generation():
+    # Sin una caché real no hay forma de avisar a los procesos: solo las señales mantienen el índice
+    if isinstance(cache.get_cache(), DummyCache):
+        return None
+    return cache.generation(INDEX_NAMESPACE)
+
+
+def invalidate_index():
+    """Hace que los índices en memoria se reconstruyan (tras cargas con bulk_create)."""
+    cache.invalidate(INDEX_NAMESPACE)
+
+
+def search_truncated(request, response):
+    """Añade X-Search-Truncated si el índice en memoria recortó el resultado de la petición."""
+    limit = getattr(getattr(request, '_request', request), 'auctions_search_limit', None)
+    if limit is not None:
+        response[TRUNCATED_HEADER] = str(limit)
+    return response
+
+
+def index_auction(auction):
+    if _fallback_backend is not None:
+        _fallback_backend.index(auction)
+
+
+def unindex_auction(pk):
+    if _fallback_backend is not None:
+        _fallback_backend.unindex(pk)
@@ -1,8 +1,40 @@
 from rest_framework import serializers
 from .models import Auction, Category, Bid, Rating, Comment
+from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 from drf_spectacular.utils import extend_schema_field
+from myFirstApiRest.fieldsets import SparseFieldsetMixin
+from .filters import request_now
+
+
+def auction_is_open(auction, request):
+    # Las vistas anotan is_open en SQL (auctions.filters); si no, se calcula
+    # con el mismo "ahora" para toda la petición
+    is_open = getattr(auction, 'is_open', None)
+    if is_open is not None:
+        return is_open
+    return auction.closed_at is None or auction.closed_at > request_now(request)
+
+
+def cached_auction(serializer):
+    """
+    Entrada de la caché del detalle: los datos serializados y closed_at, para
+    recalcular isOpen en cada lectura (una subasta que cierra no puede seguir
+    saliendo abierta hasta que caduque la entrada).
+    """
+    data = serializer.data
+    closed_at = serializer.instance.closed_at if 'isOpen' in data else None
+    return {'data': data, 'closed_at': closed_at}
+
+
+def auction_from_cache(entry, request):
+    data = entry['data']
+    if 'isOpen' in data:
+        closed_at = entry['closed_at']
+        data = {**data, 'isOpen': closed_at is None or closed_at > request_now(request)}
+    return data
 
 
 class CategoryListCreateSerializer(serializers.ModelSerializer):
@@ -16,16 +48,31 @@ class CategoryDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class AuctionListCreateSerializer(serializers.ModelSerializer):
+class AuctionListCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     isOpen = serializers.SerializerMethodField(read_only=True)
+    rating_avg = serializers.SerializerMethodField(read_only=True)
+    # Datos del ganador guardados al cerrar la subasta: salen del JOIN, sin consultar Bid
+    winning_bid = serializers.PrimaryKeyRelatedField(read_only=True)
+    winner = serializers.CharField(source='winning_bid.bidder', read_only=True, default=None)
 
     class Meta:
         model = Auction
-        fields = '__all__'
+        exclude = ['search_vector', 'version', 'updated_at']
+        read_only_fields = ['rating_sum', 'rating_count', 'final_price', 'finalized_at',
+                            'current_bid', 'bid_count', 'last_bid_at']
+        # Columnas que leen isOpen y rating_avg (ver auctions.query_planning)
+        extra_columns = {'isOpen': ('closed_at',), 'rating_avg': ('rating_sum', 'rating_count')}
 
     @extend_schema_field(serializers.BooleanField())
     def get_isOpen(self, obj):
-        return obj.closed_at is None or obj.closed_at > timezone.now()
+        return auction_is_open(obj, self.context.get('request'))
+
+    @extend_schema_field(serializers.DecimalField(max_digits=3, decimal_places=2, allow_null=True))
+    def get_rating_avg(self, obj):
+        # Media de las valoraciones a partir de los agregados, sin consultar Rating
+        if not obj.rating_count:
+            return None
+        return str((obj.rating_sum / obj.rating_count).quantize(Decimal('0.01')))
 
     def validate(self, data):
         # Obtener la fecha de creación (automáticamente añadida si no se pasa explícitamente)
@@ -47,13 +94,33 @@ class AuctionListCreateSerializer(serializers.ModelSerializer):
             })
 
         return data
+
+
+class TopBidSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    bidder = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class AuctionBatchSerializer(AuctionListCreateSerializer):
+    """Respuesta de GET /api/auctions/?ids=...: la subasta con su categoría y la puja más alta."""
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    top_bid = serializers.SerializerMethodField()
+
+    @extend_schema_field(TopBidSerializer(allow_null=True))
+    def get_top_bid(self, obj):
+        # Anotaciones de Auction.objects.with_top_bid()
+        if obj.top_bid_id is None:
+            return None
+        return TopBidSerializer({'id': obj.top_bid_id, 'bidder': obj.top_bid_bidder, 'price': obj.top_bid_price}).data
     
-class AuctionDetailSerializer(serializers.ModelSerializer):
+class AuctionDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     isOpen = serializers.SerializerMethodField(read_only=True)
     class Meta:
         model = Auction
         fields = ['title', 'description', 'price', 'category', 'isOpen', 'rating']
         read_only_fields = ['created_at', 'updated_at', 'id']
+        extra_columns = {'isOpen': ('closed_at',)}
 
     def validate_closing_date(self, value):
         if value <= timezone.now() + timedelta(days=15):
@@ -62,9 +129,7 @@ class AuctionDetailSerializer(serializers.ModelSerializer):
     
     @extend_schema_field(serializers.BooleanField())
     def get_isOpen(self, obj):
-        if obj.closed_at is None:
-            return True
-        return obj.closed_at > timezone.now()
+        return auction_is_open(obj, self.context.get('request'))
 
     
 class BidDetailSerializer(serializers.ModelSerializer):
@@ -86,13 +151,10 @@ class BidDetailSerializer(serializers.ModelSerializer):
             if data.get('price', bid.price) <= bid.price:
                 raise serializers.ValidationError("La cantidad de la puja debe ser mayor a la puja anterior.")
         
-        if 'price' in data and data['price'] > auction.price:
-            auction.price = data['price']
-            auction.save()  
-
+        # El precio de la subasta lo actualiza auctions.services dentro de la transacción
         return data
     
-class BidListCreateSerializer(serializers.ModelSerializer):
+class BidListCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Bid
         fields = '__all__'
@@ -111,16 +173,32 @@ class BidListCreateSerializer(serializers.ModelSerializer):
             if data.get('price', bid.price) <= bid.price:
                 raise serializers.ValidationError("La cantidad de la puja debe ser mayor a la puja anterior.")
 
-        if 'price' in data and data['price'] > auction.price:
-            auction.price = data['price']
-            auction.save()  
-
+        # El precio de la subasta lo actualiza auctions.services dentro de la transacción
         return data
 
+class BidBatchItemSerializer(serializers.Serializer):
+    auction = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    bidder = serializers.CharField(max_length=255)
+
+
+class BidBatchSerializer(serializers.Serializer):
+    bids = BidBatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_bids(self, value):
+        limit = getattr(settings, 'AUCTIONS_BID_BATCH_MAX', 500)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Como máximo {limit} pujas por petición.")
+        return value
+
 class RatingListCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rating
         fields = ['id', 'auction', 'value', 'user']
+        # La valoración es siempre del usuario autenticado
+        read_only_fields = ['user']
+        # Sin UniqueTogetherValidator: si ya existe, auctions.services.submit_rating la actualiza
+        validators = []
 
     def create(self, validated_data):
         return Rating.objects.create(**validated_data)
@@ -134,12 +212,12 @@ class RatingRetrieveUpdateDestroySerializer(serializers.ModelSerializer):
 
 
     
-class CommentListCreateSerializer(serializers.ModelSerializer):
+class CommentListCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = '__all__'
         
-class CommentDetailSerializer(serializers.ModelSerializer):
+class CommentDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['title','text','creation_date','modification_date']
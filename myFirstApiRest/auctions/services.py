@@ -0,0 +1,347 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from .models import Auction, Bid, Rating
+from .exceptions import BidConflict
+from .live import publish_bid
+from . import cache
+
+
+def version_bump():
+    """Campos a pasar a un UPDATE de Auction para invalidar su ETag."""
+    return {'version': F('version') + 1, 'updated_at': timezone.now()}
+
+
+def touch_auction(auction_id):
+    """Cambia la versión de la subasta (p. ej. tras crear o borrar un comentario)."""
+    Auction.objects.filter(pk=auction_id).update(**version_bump())
+
+
+def _open_auctions(now):
+    return Auction.objects.open(now)
+
+
+def _price_to_beat(auction):
+    """Una puja nueva tiene que superar la puja más alta o, si no hay, el precio de salida."""
+    return auction.price if auction.current_bid is None else auction.current_bid
+
+
+def _beaten_by(price):
+    # Misma condición que _price_to_beat(), para el UPDATE condicional
+    return Q(current_bid__lt=price) | Q(current_bid__isnull=True, price__lt=price)
+
+
+def _bid_rejected(auction_id, now):
+    # La actualización condicional no tocó ninguna fila: averiguar por qué
+    auction = Auction.objects.filter(pk=auction_id).only('price', 'current_bid', 'closed_at').first()
+    if auction is None:
+        raise NotFound("La subasta con el ID especificado no existe.")
+    if auction.closed_at and auction.closed_at <= now:
+        raise ValidationError("La subasta está cerrada. No puedes realizar una puja.")
+    raise BidConflict({
+        'detail': BidConflict.default_detail,
+        'current_price': str(_price_to_beat(auction)),
+    })
+
+
+def _publish_summary(bid):
+    # Resumen ya actualizado (y bloqueado por el UPDATE) para el evento en vivo
+    current_bid, bid_count = Auction.objects.values_list('current_bid', 'bid_count').get(pk=bid.auction_id)
+    publish_bid(bid, current_bid, bid_count)
+
+
+def place_bid(auction_id, price, bidder):
+    """
+    Registra una puja nueva. current_bid, bid_count y last_bid_at se
+    actualizan con un UPDATE condicional (current_bid < nueva puja), así dos
+    pujas simultáneas nunca pueden ganar las dos ni pisarse el resumen. Si la
+    puja llega tarde se lanza BidConflict (409).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # La puja se inserta antes para guardar su fecha en last_bid_at; si se
+        # rechaza, la excepción deshace también la inserción
+        bid = Bid.objects.create(auction_id=auction_id, price=price, bidder=bidder)
+        updated = (_open_auctions(now)
+                   .filter(_beaten_by(price), pk=auction_id)
+                   .update(current_bid=price, bid_count=F('bid_count') + 1,
+                           last_bid_at=bid.creation_date, **version_bump()))
+        if not updated:
+            _bid_rejected(auction_id, now)
+        _publish_summary(bid)
+        return bid
+
+
+def place_bids(items):
+    """
+    Aplica una lista de pujas ({'auction', 'price', 'bidder'}) en orden y
+    devuelve un resultado por puja. Las subastas se cargan y bloquean con una
+    sola consulta y se validan en memoria; las pujas aceptadas se guardan con
+    un bulk_create y cada subasta recibe un único UPDATE con su resumen final.
+    Una puja rechazada no impide aplicar las demás.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = sorted({item['auction'] for item in items})
+        # Orden por pk para que dos lotes concurrentes no se bloqueen mutuamente
+        auctions = {
+            auction.pk: auction
+            for auction in Auction.objects.select_for_update().filter(pk__in=ids).order_by('pk').only('price', 'current_bid', 'bid_count', 'closed_at')
+        }
+
+        results, accepted, touched = [], [], {}
+        for index, item in enumerate(items):
+            auction = auctions.get(item['auction'])
+            if auction is None:
+                results.append({'index': index, 'status': 'rejected', 'code': 'not_found',
+                                'detail': "La subasta con el ID especificado no existe."})
+            elif auction.closed_at and auction.closed_at <= now:
+                results.append({'index': index, 'status': 'rejected', 'code': 'closed',
+                                'detail': "La subasta está cerrada. No puedes realizar una puja."})
+            elif item['price'] <= _price_to_beat(auction):
+                results.append({'index': index, 'status': 'rejected', 'code': BidConflict.default_code,
+                                'detail': BidConflict.default_detail, 'current_price': str(_price_to_beat(auction))})
+            else:
+                auction.current_bid = item['price']
+                auction.bid_count += 1
+                bid = Bid(auction_id=auction.pk, price=item['price'], bidder=item['bidder'])
+                # Las pujas aceptadas de una subasta son crecientes: cada una fue la puja más alta
+                accepted.append((bid, auction.bid_count))
+                touched[auction.pk] = bid
+                results.append({'index': index, 'status': 'created', 'bid': bid})
+
+        Bid.objects.bulk_create([bid for bid, _ in accepted])
+        for auction_id in sorted(touched):
+            auction = auctions[auction_id]
+            # Las filas están bloqueadas: se pueden escribir los valores finales
+            Auction.objects.filter(pk=auction_id).update(
+                current_bid=auction.current_bid, bid_count=auction.bid_count,
+                last_bid_at=touched[auction_id].creation_date, **version_bump(),
+            )
+            # bulk_create no envía post_save: se invalida aquí lo que harían las señales
+            cache.invalidate(f'auction:{auction_id}')
+        for bid, bid_count in accepted:
+            publish_bid(bid, bid.price, bid_count)
+        return results
+
+
+def update_bid(bid, price):
+    """
+    Sube una puja existente. La fila de la puja se bloquea (select_for_update)
+    para que dos actualizaciones de la misma puja se apliquen en orden, y
+    current_bid se sube solo si la nueva cantidad lo supera.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        locked = Bid.objects.select_for_update().filter(pk=bid.pk).first()
+        if locked is None:
+            raise NotFound("La puja con el ID especificado no existe.")
+        if price <= locked.price:
+            raise BidConflict({
+                'detail': "La cantidad de la puja debe ser mayor a la puja anterior.",
+                'current_price': str(locked.price),
+            })
+        if not _open_auctions(now).filter(pk=locked.auction_id).exists():
+            raise ValidationError("The auction is closed. You cannot update the bid.")
+
+        Auction.objects.filter(pk=locked.auction_id).update(
+            current_bid=Greatest(Coalesce(F('current_bid'), Value(price)), Value(price)),
+            **version_bump(),
+        )
+        locked.price = price
+        locked.save(update_fields=['price'])
+        _publish_summary(locked)
+        return locked
+
+
+def _bid_summary():
+    """current_bid, bid_count y last_bid_at calculados desde la tabla Bid (subconsultas por subasta)."""
+    bids = Bid.objects.filter(auction=OuterRef('pk')).order_by()
+    return {
+        'current_bid': Subquery(bids.order_by('-price').values('price')[:1]),
+        'bid_count': Coalesce(Subquery(bids.values('auction').annotate(total=Count('id')).values('total')), Value(0)),
+        'last_bid_at': Subquery(bids.order_by('-creation_date').values('creation_date')[:1]),
+    }
+
+
+def delete_bid(bid):
+    """
+    Borra una puja y recalcula el resumen de la subasta desde las pujas que
+    quedan. La subasta se bloquea antes para que una puja simultánea no quede
+    fuera del recálculo.
+    """
+    with transaction.atomic():
+        if Auction.objects.select_for_update().filter(pk=bid.auction_id).only('pk').first() is None:
+            return
+        if not Bid.objects.filter(pk=bid.pk).delete()[0]:
+            return
+        Auction.objects.filter(pk=bid.auction_id).update(**_bid_summary(), **version_bump())
+
+
+def finalize_expired_auctions(now=None, batch_size=500):
+    """
+    Cierra un lote de subastas vencidas: guarda la puja ganadora (la más alta)
+    y el precio final con un único UPDATE. Es idempotente y se puede ejecutar
+    desde varios procesos a la vez: cada uno bloquea su lote con SKIP LOCKED
+    (en PostgreSQL) y solo se actualizan las que siguen sin finalizar.
+    Devuelve el número de subastas cerradas.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Auction.objects.select_for_update(skip_locked=True)
+            .filter(finalized_at__isnull=True, closed_at__lte=now)
+            .order_by('closed_at', 'id')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        # Mismo orden que el índice bid_auction_price_idx: una búsqueda por subasta
+        winner = Bid.objects.filter(auction=OuterRef('pk')).order_by('-price', '-creation_date')
+        finalized = Auction.objects.filter(pk__in=ids, finalized_at__isnull=True).update(
+            winning_bid=Subquery(winner.values('pk')[:1]),
+            final_price=Subquery(winner.values('price')[:1]),
+            finalized_at=now,
+            **version_bump(),
+        )
+        for auction_id in ids:
+            cache.invalidate(f'auction:{auction_id}')
+        return finalized
+
+
+def _shift_rating_aggregates(auction_id, delta_sum, delta_count):
+    Auction.objects.filter(pk=auction_id).update(
+        rating_sum=F('rating_sum') + delta_sum,
+        rating_count=F('rating_count') + delta_count,
+        **version_bump(),
+    )
+    cache.invalidate(f'auction:{auction_id}')
+
+
+def _recompute_rating_aggregates(auction_ids):
+    """
+    Recalcula los agregados de esas subastas, cambia su versión e invalida su
+    caché. Lo usan las escrituras con bulk_create, que no envían señales.
+    """
+    rebuild_rating_aggregates(Auction.objects.filter(pk__in=auction_ids), **version_bump())
+    for auction_id in auction_ids:
+        cache.invalidate(f'auction:{auction_id}')
+
+
+def _upsert_ratings(ratings):
+    # INSERT ... ON CONFLICT (auction, user) DO UPDATE SET value: una sola sentencia por lote
+    return Rating.objects.bulk_create(
+        ratings, update_conflicts=True, unique_fields=['auction', 'user'], update_fields=['value'],
+    )
+
+
+def _lock_auctions(auction_ids):
+    # Orden por pk para que dos escrituras concurrentes no se bloqueen mutuamente
+    return list(Auction.objects.select_for_update().filter(pk__in=auction_ids).order_by('pk').values_list('pk', flat=True))
+
+
+def submit_rating(auction, user, value):
+    """
+    Crea la valoración del usuario para la subasta o, si ya existe, cambia su
+    valor, con un único INSERT ... ON CONFLICT. La subasta se bloquea antes:
+    así el recálculo de rating_sum/rating_count (una subconsulta sobre sus
+    valoraciones) ve también las valoraciones que otras peticiones acaban de
+    confirmar.
+    """
+    with transaction.atomic():
+        _lock_auctions([auction.pk])
+        rating, = _upsert_ratings([Rating(auction=auction, user=user, value=value)])
+        _recompute_rating_aggregates([auction.pk])
+        return rating
+
+
+def import_ratings(items, batch_size=1000):
+    """
+    Importa valoraciones ({'auction', 'user', 'value'} con ids) con
+    bulk_create(update_conflicts=True): las existentes cambian de valor y las
+    demás se crean. Si un par (subasta, usuario) se repite gana el último.
+    Los agregados de las subastas afectadas se recalculan al final con un
+    único UPDATE. Devuelve el número de valoraciones escritas.
+    """
+    latest = {(item['auction'], item['user']): item['value'] for item in items}
+    ratings = [Rating(auction_id=auction_id, user_id=user_id, value=value)
+               for (auction_id, user_id), value in latest.items()]
+    auction_ids = sorted({auction_id for auction_id, _ in latest})
+    with transaction.atomic():
+        _lock_auctions(auction_ids)
+        for start in range(0, len(ratings), batch_size):
+            _upsert_ratings(ratings[start:start + batch_size])
+        _recompute_rating_aggregates(auction_ids)
+    return len(ratings)
+
+
+def update_rating(rating, value):
+    with transaction.atomic():
+        # Siempre subasta y después valoración, el mismo orden que submit_rating()
+        _lock_auctions([rating.auction_id])
+        locked = Rating.objects.select_for_update().get(pk=rating.pk)
+        _shift_rating_aggregates(locked.auction_id, value - locked.value, 0)
+        locked.value = value
+        locked.save(update_fields=['value'])
+        return locked
+
+
+def delete_rating(rating):
+    with transaction.atomic():
+        _lock_auctions([rating.auction_id])
+        locked = Rating.objects.select_for_update().filter(pk=rating.pk).first()
+        if locked is None:
+            return
+        locked.delete()
+        _shift_rating_aggregates(locked.auction_id, -locked.value, -1)
+
+
+def rebuild_bid_summary(queryset=None):
+    """
+    Recalcula current_bid/bid_count/last_bid_at desde la tabla Bid con un
+    único UPDATE ... SET = (subconsulta). No cambia la versión de las
+    subastas. Devuelve el número de subastas actualizadas.
+    """
+    queryset = Auction.objects.all() if queryset is None else queryset
+    return queryset.update(**_bid_summary())
+
+
+def bid_summary_drift(queryset=None):
+    """Subastas cuyo resumen de pujas no coincide con la tabla Bid (una sola consulta)."""
+    queryset = Auction.objects.all() if queryset is None else queryset
+    expected = _bid_summary()
+    # Los NULL se sustituyen por un valor imposible para poder compararlos con =
+    no_bid = Value(Decimal('-1'))
+    no_date = Value(datetime(1970, 1, 1, tzinfo=dt_timezone.utc))
+    return queryset.annotate(
+        stored_current_bid=Coalesce(F('current_bid'), no_bid),
+        stored_last_bid_at=Coalesce(F('last_bid_at'), no_date),
+        expected_current_bid=Coalesce(expected['current_bid'], no_bid),
+        expected_bid_count=expected['bid_count'],
+        expected_last_bid_at=Coalesce(expected['last_bid_at'], no_date),
+    ).exclude(
+        stored_current_bid=F('expected_current_bid'),
+        bid_count=F('expected_bid_count'),
+        stored_last_bid_at=F('expected_last_bid_at'),
+    )
+
+
+def rebuild_rating_aggregates(queryset=None, **extra):
+    """
+    Recalcula rating_sum/rating_count desde la tabla Rating con un único
+    UPDATE ... SET = (subconsulta); `extra` son más columnas para el mismo
+    UPDATE (p. ej. version_bump()). Devuelve el número de subastas actualizadas.
+    """
+    ratings = Rating.objects.filter(auction=OuterRef('pk')).order_by().values('auction')
+    sums = ratings.annotate(total=Sum('value')).values('total')
+    counts = ratings.annotate(total=Count('id')).values('total')
+    queryset = Auction.objects.all() if queryset is None else queryset
+    return queryset.update(
+        rating_sum=Coalesce(Subquery(sums), Value(Decimal('0'))),
+        rating_count=Coalesce(Subquery(counts), Value(0)),
+        **extra,
+    )
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Auction, Bid, Category, Comment, Rating
+from .services import touch_auction
+from . import cache, search
+from .facets import FACETS_NAMESPACE
+
+# Campos que cuentan las facetas de búsqueda (auctions/facets.py)
+FACET_FIELDS = {'category', 'category_id', 'brand', 'price'}
+
+
+@receiver(post_save, sender=Auction)
+def auction_saved(sender, instance, update_fields=None, **kwargs):
+    # Índice de búsqueda en memoria (solo se usa fuera de PostgreSQL)
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        search.index_auction(instance)
+    if update_fields is None or FACET_FIELDS & set(update_fields):
+        cache.invalidate(FACETS_NAMESPACE)
+    cache.invalidate(f'auction:{instance.pk}')
+
+
+@receiver(post_delete, sender=Auction)
+def auction_deleted(sender, instance, **kwargs):
+    search.unindex_auction(instance.pk)
+    cache.invalidate(FACETS_NAMESPACE)
+    cache.invalidate(f'auction:{instance.pk}')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    cache.invalidate('categories')
+    # Las facetas llevan el nombre de la categoría
+    cache.invalidate(FACETS_NAMESPACE)
+
+
+@receiver([post_save, post_delete], sender=Bid)
+@receiver([post_save, post_delete], sender=Rating)
+def auction_child_changed(sender, instance, **kwargs):
+    # Las pujas cambian el precio y las valoraciones los agregados de la subasta
+    cache.invalidate(f'auction:{instance.auction_id}')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    # Los comentarios no salen en el detalle, pero sí forman parte del ETag
+    touch_auction(instance.auction_id)
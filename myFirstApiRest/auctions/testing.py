@@ -0,0 +1,37 @@
+"""
+Utilidades para los tests (auctions/tests.py, users/tests.py).
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class QueryCountAssertionsMixin:
+    """Mixin para TestCase con aserciones sobre el número de consultas SQL."""
+
+    def assertQueryCountIndependentOfSize(self, url, add_rows, sizes=(1, 5, 25), client=None):
+        """
+        Para cada tamaño de `sizes` llama a `add_rows(n)` para añadir las filas
+        que faltan y hace GET `url`. Falla si el número de consultas cambia con
+        el número de filas devueltas (el típico N+1 de un serializer).
+        """
+        client = client or APIClient()
+        # Petición de calentamiento: el trabajo que se hace una sola vez
+        # (cachés, índices en memoria) no debe contar
+        client.get(url)
+        counts, captured, created = {}, {}, 0
+        for size in sorted(sizes):
+            add_rows(size - created)
+            created = size
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts[size] = len(context.captured_queries)
+            captured[size] = [query['sql'] for query in context.captured_queries]
+
+        if len(set(counts.values())) > 1:
+            largest = max(counts)
+            queries = '\n'.join(f'  {sql}' for sql in captured[largest])
+            self.fail(f"GET {url}: el número de consultas crece con el número de filas {counts}.\n"
+                      f"Consultas con {largest} filas:\n{queries}")
+        return counts
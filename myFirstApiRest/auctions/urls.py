@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CategoryListCreate, CategoryRetrieveUpdateDestroy, AuctionListCreate, AuctionDetail, AuctionSearch, UserAuctionListView, BidDetail, AuctionBidListCreate, RatingListCreateView, RatingRetrieveUpdateDestroyView, CommentListCreateView, CommentRetrieveUpdateDestroyView
+from .views import CategoryListCreate, CategoryRetrieveUpdateDestroy, AuctionListCreate, AuctionDetail, AuctionSearch, AuctionExport, UserAuctionListView, BidDetail, AuctionBidListCreate, AuctionBidExport, BidBatchCreate, RatingListCreateView, RatingRetrieveUpdateDestroyView, CommentListCreateView, CommentRetrieveUpdateDestroyView, auction_bid_stream
 
 app_name="auctions"
 urlpatterns = [
@@ -7,11 +7,15 @@ urlpatterns = [
     path('categories/<int:pk>/', CategoryRetrieveUpdateDestroy.as_view(), name='category-detail'),
     path('', AuctionListCreate.as_view(), name='auction-list-create'),
     path('search/', AuctionSearch.as_view(), name='auction-search'),
+    path('export/', AuctionExport.as_view(), name='auction-export'),
     path('<int:pk>/', AuctionDetail.as_view(), name='auction-detail'),
     path('users/', UserAuctionListView.as_view(), name='action-from-users'),
     # path('<int:id_auction>/bids/', BidListCreate.as_view(), name='bid-list-create'),
     path('<int:id_auction>/bids/<int:pk>', BidDetail.as_view(), name='bid-detail'),
     path('<int:auction_id>/bids/', AuctionBidListCreate.as_view(), name='auction-bid-list-create'),
+    path('<int:auction_id>/bids/export/', AuctionBidExport.as_view(), name='auction-bid-export'),
+    path('<int:auction_id>/bids/stream/', auction_bid_stream, name='auction-bid-stream'),
+    path('bids/batch/', BidBatchCreate.as_view(), name='bid-batch-create'),
     path('ratings/', RatingListCreateView.as_view(), name='rating-create-update'),
     path('ratings/<int:pk>/', RatingRetrieveUpdateDestroyView.as_view(), name='rating-delete'),
     path('<int:auction_id>/comments/', CommentListCreateView.as_view(), name = 'comment-create'),
@@ -1,69 +1,141 @@
 from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework import generics
 from rest_framework import serializers
-from django.db.models import Q
+from rest_framework import status
 from rest_framework.response import Response
 from .models import Category, Auction, Bid, Rating, Comment
-from .serializers import CategoryListCreateSerializer, CategoryDetailSerializer, AuctionListCreateSerializer, AuctionDetailSerializer, BidDetailSerializer, BidListCreateSerializer, RatingListCreateSerializer, RatingRetrieveUpdateDestroySerializer, CommentListCreateSerializer, CommentDetailSerializer
+from .serializers import cached_auction, auction_from_cache, CategoryListCreateSerializer, CategoryDetailSerializer, AuctionListCreateSerializer, AuctionBatchSerializer, AuctionDetailSerializer, BidDetailSerializer, BidListCreateSerializer, BidBatchSerializer, RatingListCreateSerializer, RatingRetrieveUpdateDestroySerializer, CommentListCreateSerializer, CommentDetailSerializer
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated, IsAuthenticatedOrReadOnly
 from .permissions import IsOwnerOrAdmin
+from .services import place_bid, place_bids, update_bid, delete_bid, submit_rating, update_rating, delete_rating
+from .query_planning import OptimizedQuerysetMixin, optimize_queryset
+from .search import search_truncated
+from . import cache
+from .etags import AuctionETagMixin
+from .exports import AUCTION_COLUMNS, BID_COLUMNS, ExportAPIView
+from .facets import FACETS_PARAMETER, requested_facets, search_facets
+from .filters import (IDS_PARAMETER, OPEN_PARAMETER, annotate_is_open, check_search_pagination, filter_open,
+                      filter_search, requested_ids)
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from .live import bid_events
 from rest_framework.exceptions import NotFound
 # Create your views here.
 
-class CategoryListCreate(generics.ListCreateAPIView):
+class CategoryListCreate(OptimizedQuerysetMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategoryListCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Las categorías casi nunca cambian: se sirven desde la caché
+        data = cache.read_through('categories', 'categories', request.get_full_path(),
+                                  lambda: super(CategoryListCreate, self).list(request, *args, **kwargs).data)
+        return Response(data)
+
 class CategoryRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategoryDetailSerializer
 
-class AuctionListCreate(generics.ListCreateAPIView):
-    queryset = Auction.objects.all()
+@extend_schema_view(get=extend_schema(parameters=[OPEN_PARAMETER, IDS_PARAMETER]))
+class AuctionListCreate(OptimizedQuerysetMixin, generics.ListCreateAPIView):
+    # Mismo orden que el índice auction_created_idx
+    queryset = Auction.objects.order_by('-created_at', '-id')
     serializer_class = AuctionListCreateSerializer
+    cursor_ordering = ('-created_at', '-id')
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS and 'ids' in self.request.query_params:
+            return AuctionBatchSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = annotate_is_open(filter_open(queryset, self.request), self.request)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        ids = requested_ids(request)
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        # Lote (lista de seguimiento, "mis pujas"): una sola consulta, en el orden pedido y sin paginar
+        queryset = self.get_queryset().filter(pk__in=ids).order_by()
+        serializer = self.get_serializer(many=True)
+        if 'top_bid' in serializer.child.fields:
+            queryset = queryset.with_top_bid()
+        found = {auction.pk: auction for auction in queryset}
+        serializer.instance = [found[pk] for pk in ids if pk in found]
+        return Response({'results': serializer.data, 'missing': [pk for pk in ids if pk not in found]})
 
 class AuctionRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsOwnerOrAdmin] 
     queryset = Auction.objects.all()
     serializer_class = AuctionDetailSerializer
 
-class AuctionSearch(generics.ListAPIView):
+@extend_schema_view(get=extend_schema(parameters=[OPEN_PARAMETER, FACETS_PARAMETER]))
+class AuctionSearch(OptimizedQuerysetMixin, generics.ListAPIView):
     serializer_class = AuctionListCreateSerializer
-    queryset = Auction.objects.all()
+    queryset = Auction.objects.order_by('-created_at', '-id')
+    cursor_ordering = ('-created_at', '-id')
     def get_queryset(self):
+        check_search_pagination(self.request, self.paginator, self)
         queryset = super().get_queryset()
-        texto = self.request.query_params.get('description', '')
-        category_name = self.request.query_params.get('category', '')
-        precio_min = self.request.query_params.get('priceMin', None)
-        precio_max = self.request.query_params.get('priceMax', None)
-
-        filters = Q()
-        if texto:
-            filters &= Q(title__icontains=texto) | Q(description__icontains=texto)
-        if category_name:
-            filters &= Q(category__name__iexact=category_name)
-        if precio_min:
-            filters &= Q(price__gte=precio_min)
-        if precio_max:
-            filters &= Q(price__lte=precio_max)
-
-        return queryset.filter(filters)
+        return annotate_is_open(filter_search(queryset, self.request), self.request)
+
+    def list(self, request, *args, **kwargs):
+        facets = requested_facets(request)
+        if not facets:
+            return search_truncated(request, super().list(request, *args, **kwargs))
+        # El mismo queryset filtrado para la página y para las facetas (la búsqueda de texto se hace una vez)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['facets'] = search_facets(queryset, request, facets)
+        return search_truncated(request, response)
     
-class AuctionDetail(generics.RetrieveUpdateDestroyAPIView):
+@extend_schema_view(get=extend_schema(
+    parameters=[OPEN_PARAMETER],
+    responses={(200, 'text/csv'): OpenApiTypes.BINARY, (200, 'application/x-ndjson'): OpenApiTypes.BINARY},
+))
+class AuctionExport(ExportAPIView):
+    """Todas las subastas (con los filtros de AuctionSearch) en CSV o NDJSON."""
+    columns = AUCTION_COLUMNS
+    filename = 'auctions'
+
+    def get_queryset(self):
+        return filter_search(Auction.objects.order_by('-created_at', '-id'), self.request)
+
+class AuctionDetail(AuctionETagMixin, OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Auction.objects.all()
     
     def get_serializer_class(self):
         if self.request.method == "PUT" or self.request.method == "PATCH":
             return AuctionDetailSerializer
         return AuctionListCreateSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = annotate_is_open(queryset, self.request)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs['pk']
+        entry = cache.read_through('auction', f'auction:{pk}', request.get_full_path(),
+                                   lambda: cached_auction(self.get_serializer(self.get_object())))
+        return Response(auction_from_cache(entry, request))
     
 class UserAuctionListView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, *args, **kwargs):
         # Obtener las subastas del usuario autenticado
-        user_auctions = Auction.objects.filter(auctioneer=request.user)
-        serializer = AuctionListCreateSerializer(user_auctions, many=True)
+        serializer = AuctionListCreateSerializer(many=True, context={'request': request})
+        user_auctions = annotate_is_open(Auction.objects.filter(auctioneer=request.user), request)
+        serializer.instance = optimize_queryset(user_auctions, serializer)
         return Response(serializer.data)
     
 class BidListCreate(generics.ListCreateAPIView):
@@ -75,19 +147,15 @@ class BidListCreate(generics.ListCreateAPIView):
         auction_id = self.request.data.get('auction')
         
         # Verificar que la subasta existe
-        try:
-            auction = Auction.objects.get(id=auction_id)
-        except Auction.DoesNotExist:
+        if not Auction.objects.filter(id=auction_id).exists():
             raise serializers.ValidationError("Subasta no válida o no encontrada.")
 
-        # Guardar la puja y asociarla con la subasta correcta
-        serializer.save(auction=auction)
-
-        return Response({
-            "id": auction.id,
-            "auction_price": auction.price,
-            "bid": serializer.data
-        })
+        # Guardar la puja y subir el precio de la subasta en una sola transacción
+        serializer.instance = place_bid(
+            auction_id,
+            serializer.validated_data['price'],
+            serializer.validated_data['bidder'],
+        )
 
 class BidDetail(generics.RetrieveUpdateDestroyAPIView):
     def get_serializer_class(self):
@@ -106,17 +174,26 @@ class BidDetail(generics.RetrieveUpdateDestroyAPIView):
         bid_id = self.kwargs.get('pk')
         
         # Intentar obtener la subasta
-        try:
-            auction = Auction.objects.get(id=auction_id)
-        except Auction.DoesNotExist:
+        if not Auction.objects.filter(id=auction_id).exists():
             raise NotFound("La subasta con el ID especificado no existe.")
         
-        # Actualizar la puja
-        bid = serializer.save(auction=auction)
+        # Actualizar la puja (bloqueando la fila) y el precio de la subasta
+        if 'price' not in serializer.validated_data:
+            return serializer.instance
+        bid = update_bid(serializer.instance, serializer.validated_data['price'])
+        serializer.instance = bid
         return bid
+
+    def perform_destroy(self, instance):
+        # Recalcula current_bid, bid_count y last_bid_at de la subasta
+        delete_bid(instance)
     
-class AuctionBidListCreate(generics.ListCreateAPIView):
+class AuctionBidListCreate(AuctionETagMixin, OptimizedQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = BidListCreateSerializer
+    etag_auction_kwarg = 'auction_id'
+    # El cursor se apoya en columnas inmutables: con -price una puja subida
+    # con PATCH cambiaría de posición y se saltaría o repetiría entre páginas
+    cursor_ordering = ('-creation_date', '-id')
 
     def get_queryset(self):
         auction_id = self.kwargs.get('auction_id')
@@ -124,8 +201,50 @@ class AuctionBidListCreate(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         auction_id = self.kwargs.get('auction_id')
-        auction = Auction.objects.get(id=auction_id)
-        serializer.save(auction=auction)
+        serializer.instance = place_bid(
+            auction_id,
+            serializer.validated_data['price'],
+            serializer.validated_data['bidder'],
+        )
+
+
+@extend_schema_view(get=extend_schema(
+    responses={(200, 'text/csv'): OpenApiTypes.BINARY, (200, 'application/x-ndjson'): OpenApiTypes.BINARY},
+))
+class AuctionBidExport(ExportAPIView):
+    """Historial completo de pujas de una subasta en CSV o NDJSON."""
+    columns = BID_COLUMNS
+
+    def get_queryset(self):
+        auction_id = self.kwargs['auction_id']
+        if not Auction.objects.filter(pk=auction_id).exists():
+            raise NotFound("La subasta con el ID especificado no existe.")
+        self.filename = f'auction-{auction_id}-bids'
+        # Mismo orden que el listado de pujas (índice bid_auction_price_idx)
+        return Bid.objects.filter(auction_id=auction_id).order_by('-price', '-creation_date')
+
+
+class BidBatchCreate(generics.GenericAPIView):
+    """
+    Varias pujas (de una o varias subastas) en una sola petición. Cada puja se
+    acepta o se rechaza por separado; la respuesta trae un resultado por puja
+    en el mismo orden. 201 si se aceptan todas, 207 si alguna se rechaza.
+    """
+    serializer_class = BidBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = place_bids(serializer.validated_data['bids'])
+
+        created = 0
+        for result in results:
+            if result['status'] == 'created':
+                result['bid'] = BidListCreateSerializer(result['bid']).data
+                created += 1
+        data = {'created': created, 'rejected': len(results) - created, 'results': results}
+        return Response(data, status=status.HTTP_201_CREATED if created == len(results) else status.HTTP_207_MULTI_STATUS)
 
 
 class RatingListCreateView(generics.ListCreateAPIView):
@@ -138,15 +257,11 @@ class RatingListCreateView(generics.ListCreateAPIView):
         value = serializer.validated_data['value']
         user = self.request.user
 
-        existing_rating = Rating.objects.filter(auction=auction, user=user).first()
-        if existing_rating:
-            existing_rating.value = value
-            existing_rating.save()
-        else:
-            serializer.save(user=user)
+        # Crea o actualiza la valoración y los agregados de la subasta
+        serializer.instance = submit_rating(auction, user, value)
 
     def get_queryset(self):
-        return Rating.objects.all()
+        return Rating.objects.order_by('id')
 
 class RatingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Rating.objects.all()
@@ -156,14 +271,23 @@ class RatingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         rating = super().get_object()
         return rating
+
+    def perform_update(self, serializer):
+        if 'value' in serializer.validated_data:
+            serializer.instance = update_rating(serializer.instance, serializer.validated_data['value'])
+
+    def perform_destroy(self, instance):
+        delete_rating(instance)
     
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(AuctionETagMixin, OptimizedQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = CommentListCreateSerializer
+    etag_auction_kwarg = 'auction_id'
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cursor_ordering = ('creation_date', 'id')
 
     def get_queryset(self):
         auction_id = self.kwargs.get('auction_id')
-        return Comment.objects.filter(auction_id=auction_id)
+        return Comment.objects.filter(auction_id=auction_id).order_by('creation_date', 'id')
 
 class CommentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Comment.objects.all()
@@ -171,4 +295,21 @@ class CommentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 
-    
+@require_GET
+async def auction_bid_stream(request, auction_id):
+    """
+    Stream Server-Sent Events con las pujas nuevas de una subasta. Necesita
+    ASGI (myFirstApiRest/asgi.py): cada conexión abierta es solo una corrutina
+    esperando en el event loop, sin ocupar un hilo.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Este endpoint necesita un servidor ASGI."}, status=501)
+    if not await Auction.objects.filter(pk=auction_id).aexists():
+        raise Http404("La subasta con el ID especificado no existe.")
+
+    # La suscripción y el snapshot se hacen en la primera vuelta del generador
+    response = StreamingHttpResponse(bid_events(auction_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
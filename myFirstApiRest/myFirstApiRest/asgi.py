@@ -10,7 +10,12 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from myFirstApiRest.db import open_pools
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myFirstApiRest.settings")
+# Con ASGI cada petición corre en un hilo distinto y las conexiones persistentes
+# no se reutilizarían (quedarían abiertas hasta su CONN_MAX_AGE): mejor DB_POOL.
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
+open_pools()
@@ -0,0 +1,55 @@
+"""
+Configuración y arranque de las conexiones a la base de datos.
+
+database_config() construye DATABASES['default'] a partir de las variables de
+entorno (DATABASE_URL, DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS, DB_POOL y
+DB_POOL_*); con DB_POOL=true comprueba antes que el pool puede funcionar.
+
+Los pools de psycopg (DB_POOL) se abren solos con la primera consulta,
+así que la primera petición de cada worker pagaría todas las conexiones iniciales.
+open_pools() los abre al cargar la aplicación y rellena min_size conexiones en
+segundo plano. No usar con `gunicorn --preload`: las conexiones abiertas antes
+del fork se compartirían entre procesos.
+"""
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+
+def check_pool_driver(config):
+    """El pool de Django necesita PostgreSQL con psycopg 3 y psycopg_pool."""
+    if config.get('ENGINE') != 'django.db.backends.postgresql':
+        raise ImproperlyConfigured("DB_POOL=true solo está disponible con PostgreSQL.")
+    try:
+        import psycopg, psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured('DB_POOL=true necesita psycopg 3 y su pool: pip install "psycopg[binary,pool]".')
+
+
+def database_config(environ):
+    url = environ.get('DATABASE_URL')
+    if not url:
+        return {}
+    pool = environ.get('DB_POOL', 'false').lower() == 'true'
+    config = dj_database_url.parse(
+        url,
+        # Django no admite pool y conexiones persistentes a la vez
+        conn_max_age=0 if pool else int(environ.get('DB_CONN_MAX_AGE', '60')),
+        conn_health_checks=environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+    )
+    if pool:
+        check_pool_driver(config)
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(environ.get('DB_POOL_MAX_SIZE', '10')),
+            # Segundos de espera por una conexión libre antes de fallar
+            'timeout': float(environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+    return config
+
+
+def open_pools():
+    for conn in connections.all():
+        pool = getattr(conn, 'pool', None)
+        if pool:
+            pool.open(wait=False)
@@ -0,0 +1,42 @@
+"""
+Respuestas con solo algunos campos (sparse fieldsets):
+
+    GET /api/auctions/?fields=id,title,thumbnail,price,isOpen
+    GET /api/auctions/?exclude=description
+
+SparseFieldsetMixin quita del serializer los campos no pedidos. Como
+auctions.query_planning construye el only() a partir de los campos del
+serializer, las columnas que no se devuelven (p. ej. description) tampoco se
+leen de la base de datos.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value else set()
+
+
+class SparseFieldsetMixin:
+    """
+    Para ModelSerializer. Lee `fields` y `exclude` de la query string de la
+    petición del contexto. Solo actúa en lecturas: en escrituras el serializer
+    necesita todos sus campos para validar.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        params = getattr(request, 'query_params', request.GET)
+        only, exclude = _names(params.get('fields')), _names(params.get('exclude'))
+        if not only and not exclude:
+            return
+
+        unknown = (only | exclude) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': f"Campos desconocidos: {', '.join(sorted(unknown))}."})
+        for name in list(self.fields):
+            if (only and name not in only) or name in exclude:
+                self.fields.pop(name)
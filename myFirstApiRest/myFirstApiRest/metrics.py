@@ -0,0 +1,235 @@
+"""
+Métricas por endpoint: tiempo de respuesta, número y tiempo de consultas SQL
+y tamaño de la respuesta, agregados en memoria por nombre de URL
+(p. ej. "auctions:auction-search") y publicados en /api/metrics/ con el
+formato de texto de Prometheus.
+
+Los datos son por proceso: con varios workers cada uno publica los suyos.
+Configuración en settings.METRICS. El endpoint pide la cabecera
+X-Metrics-Token (METRICS['TOKEN']) o un usuario staff, salvo que
+METRICS['PUBLIC'] sea true.
+
+Bajo ASGI las consultas del ORM asíncrono se ejecutan con sync_to_async en el
+hilo de la petición (thread_sensitive); el execute_wrapper que las cuenta se
+instala y se retira en ese mismo hilo, así que las vistas asíncronas también
+publican db_queries_total y db_query_duration_seconds_total.
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'SLOW_QUERY_MS': 200,
+    'BUCKETS_MS': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    'TOKEN': None,
+    'PUBLIC': False,
+}
+
+
+def metrics_setting(name):
+    return getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+
+
+class EndpointStats:
+    __slots__ = ('buckets', 'count', 'duration', 'queries', 'db_duration', 'response_bytes', 'slow_queries')
+
+    def __init__(self, n_buckets):
+        self.buckets = [0] * (n_buckets + 1)  # el último es +Inf
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_duration = 0.0
+        self.response_bytes = 0
+        self.slow_queries = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._collectors = []
+        self.bounds = tuple(ms / 1000 for ms in metrics_setting('BUCKETS_MS'))
+
+    def observe(self, view, method, duration, queries, db_duration, response_bytes, slow_queries):
+        key = (view, method)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(len(self.bounds))
+            stats.buckets[bisect_left(self.bounds, duration)] += 1
+            stats.count += 1
+            stats.duration += duration
+            stats.queries += queries
+            stats.db_duration += db_duration
+            stats.response_bytes += response_bytes
+            stats.slow_queries += slow_queries
+
+    def register_collector(self, collector):
+        """
+        Añade un callable que devuelve líneas extra en formato Prometheus
+        (otros módulos publican así sus contadores en el mismo endpoint).
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def render(self):
+        with self._lock:
+            snapshot = sorted(self._stats.items())
+            snapshot = [(key, _copy(stats)) for key, stats in snapshot]
+
+        lines = [
+            '# HELP http_request_duration_seconds Tiempo de respuesta por endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (view, method), stats in snapshot:
+            labels = f'view="{view}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(self.bounds + (None,), stats.buckets):
+                cumulative += count
+                le = '+Inf' if bound is None else f'{bound:g}'
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats.duration:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+        counters = (
+            ('db_queries_total', 'Consultas SQL ejecutadas.', 'queries', '{}'),
+            ('db_query_duration_seconds_total', 'Tiempo total en la base de datos.', 'db_duration', '{:.6f}'),
+            ('db_slow_queries_total', 'Consultas por encima de SLOW_QUERY_MS.', 'slow_queries', '{}'),
+            ('http_response_size_bytes_total', 'Bytes de respuesta enviados.', 'response_bytes', '{}'),
+        )
+        for name, help_text, attr, fmt in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for (view, method), stats in snapshot:
+                value = fmt.format(getattr(stats, attr))
+                lines.append(f'{name}{{view="{view}",method="{method}"}} {value}')
+
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(stats):
+    copy = EndpointStats(len(stats.buckets) - 1)
+    for attr in EndpointStats.__slots__:
+        value = getattr(stats, attr)
+        setattr(copy, attr, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+registry = MetricsRegistry()
+
+
+class QueryTracker:
+    """execute_wrapper que cuenta y cronometra las consultas de una petición."""
+
+    def __init__(self, slow_seconds, path):
+        self.slow_seconds = slow_seconds
+        self.path = path
+        self.count = 0
+        self.duration = 0.0
+        self.slow = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slow_seconds:
+                self.slow += 1
+                logger.warning("Consulta lenta (%.1f ms) en %s: %.1000s", elapsed * 1000, self.path, sql)
+
+
+def _add_wrapper(tracker):
+    connection.execute_wrappers.append(tracker)
+
+
+def _remove_wrapper(tracker):
+    connection.execute_wrappers.remove(tracker)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = metrics_setting('ENABLED')
+        self.sample_rate = float(metrics_setting('SAMPLE_RATE'))
+        self.slow_seconds = float(metrics_setting('SLOW_QUERY_MS')) / 1000
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.enabled and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        tracker = QueryTracker(self.slow_seconds, request.path)
+        start = time.perf_counter()
+        with connection.execute_wrapper(tracker):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, tracker)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        # La conexión es de cada hilo: el wrapper se instala en el hilo en el que
+        # sync_to_async (thread_sensitive) ejecuta las consultas de esta petición
+        tracker = QueryTracker(self.slow_seconds, request.path)
+        start = time.perf_counter()
+        await sync_to_async(_add_wrapper)(tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_wrapper)(tracker)
+        self.record(request, response, time.perf_counter() - start, tracker)
+        return response
+
+    def record(self, request, response, duration, tracker):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        if view == 'metrics':
+            return
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(view, request.method, duration, tracker.count, tracker.duration, size, tracker.slow)
+
+
+def metrics_allowed(request):
+    if metrics_setting('PUBLIC'):
+        return True
+    token = metrics_setting('TOKEN')
+    if token and constant_time_compare(request.headers.get('X-Metrics-Token', ''), token):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+def metrics_view(request):
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,79 @@
+"""
+Renderer y parser JSON sobre orjson (opcional, configurados en
+settings.REST_FRAMEWORK).
+
+ORJSONRenderer produce exactamente los mismos bytes que JSONRenderer de DRF
+con la configuración por defecto (UNICODE_JSON, COMPACT_JSON y STRICT_JSON
+activados): separadores compactos, UTF-8 sin escapar, \\u2028 y \\u2029
+escapados. Los tipos que orjson no trata igual que DRF (Decimal, datetime,
+cadenas perezosas...) pasan por el mismo JSONEncoder de DRF. En cualquier otro
+caso (indentación, otra configuración, un valor que orjson no sabe escribir)
+se usa el renderer de DRF.
+
+Única diferencia conocida: los float menores que 1e-4 o mayores que 1e16 se
+escriben sin exponente o con otro formato (1e16 frente a 1e+16). La API no
+devuelve float: los DecimalField salen como cadenas.
+
+Si orjson no está instalado las dos clases se comportan como las de DRF.
+"""
+import io
+from django.conf import settings
+from rest_framework import parsers, renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+# orjson convierte en float los enteros de más de 64 bits y json los deja exactos.
+# Para detectarlos se pasan todos los dígitos a 0 y se busca una racha de 19
+# (mucho más rápido que una expresión regular sobre el cuerpo entero).
+DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+LONG_NUMBER = b'0' * 19
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    def __init__(self):
+        super().__init__()
+        self.encoder = self.encoder_class()
+        # orjson solo puede reproducir la salida compacta, UTF-8 y estricta
+        self.fast = orjson is not None and not self.ensure_ascii and self.compact and self.strict
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.fast or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder.default, option=OPTIONS)
+        except (orjson.JSONEncodeError, ValueError):
+            # Enteros de más de 64 bits, NaN en un Decimal, etc.: DRF decide
+            return super().render(data, accepted_media_type, renderer_context)
+        if LINE_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028')
+        if PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class ORJSONParser(parsers.JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8') or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read() if stream is not None else b''
+        if LONG_NUMBER not in body.translate(DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        # JSON inválido (mismo mensaje de error que DRF) o números muy largos
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -12,8 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
-import dj_database_url
 from dotenv import load_dotenv
+from myFirstApiRest.db import database_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', #Añadir en primera posición
+    'myFirstApiRest.metrics.RequestMetricsMiddleware', #Métricas por endpoint, ver METRICS
     'django.middleware.common.CommonMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -82,10 +83,53 @@ WSGI_APPLICATION = "myFirstApiRest.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Conexiones persistentes: cada hilo reutiliza su conexión durante
+# DB_CONN_MAX_AGE segundos (0 = una conexión nueva por petición) y comprueba que
+# sigue viva antes de reutilizarla. Con DB_POOL=true se usa en su lugar el pool de
+# Django (PostgreSQL con psycopg 3: pip install "psycopg[binary,pool]"), que es lo
+# recomendable con ASGI: asgi.py pone DB_CONN_MAX_AGE=0 si no se ha configurado.
+# requirements.txt solo instala psycopg2: sin psycopg 3 DB_POOL=true no arranca
+# (ImproperlyConfigured al cargar los settings).
+
 load_dotenv()
+DB_POOL = os.getenv('DB_POOL', 'false').lower() == 'true'
+# Variables y comprobación del driver del pool en myFirstApiRest/db.py
 DATABASES = {
-'default': dj_database_url.config(default=os.getenv("DATABASE_URL"))
+'default': database_config(os.environ),
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# locmem por defecto; CACHE_BACKEND/CACHE_LOCATION permiten usar p. ej. Redis o Memcached
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'realsuciedad'),
+    }
 }
+AUCTIONS_CACHE_TIMEOUT = int(os.getenv('AUCTIONS_CACHE_TIMEOUT', '300'))
+
+# Stream de pujas en vivo (auctions/broker.py, auctions/live.py). El broker en
+# memoria solo reparte dentro de un proceso; con varios workers hay que
+# configurar uno compartido con la misma interfaz.
+ASGI_APPLICATION = "myFirstApiRest.asgi.application"
+AUCTIONS_BROKER = os.getenv('AUCTIONS_BROKER', 'auctions.broker.InProcessBroker')
+AUCTIONS_SSE_KEEPALIVE = int(os.getenv('AUCTIONS_SSE_KEEPALIVE', '15'))
+AUCTIONS_SSE_QUEUE_SIZE = 100
+
+# Máximo de pujas por petición en /api/auctions/bids/batch/
+AUCTIONS_BID_BATCH_MAX = int(os.getenv('AUCTIONS_BID_BATCH_MAX', '500'))
+# Máximo de subastas por petición en GET /api/auctions/?ids=...
+AUCTIONS_BATCH_MAX = int(os.getenv('AUCTIONS_BATCH_MAX', '100'))
+
+# Facetas de /api/auctions/search/?facets=true: límites de los tramos de precio
+# y número máximo de marcas devueltas
+AUCTIONS_FACET_PRICE_EDGES = (10, 25, 50, 100, 250, 500, 1000)
+AUCTIONS_FACET_BRAND_LIMIT = int(os.getenv('AUCTIONS_FACET_BRAND_LIMIT', '20'))
+
+# Filas que lee cada vuelta del cursor en /api/auctions/export/ y .../bids/export/
+AUCTIONS_EXPORT_CHUNK_SIZE = int(os.getenv('AUCTIONS_EXPORT_CHUNK_SIZE', '2000'))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -129,10 +173,21 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS':'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS':'auctions.pagination.OptionalCursorPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    # JWTAuthentication con el usuario cacheado (users/authentication.py)
+    'DEFAULT_AUTHENTICATION_CLASSES': ('users.authentication.CachedJWTAuthentication',),
+    # JSON con orjson (mismos bytes que JSONRenderer); sin orjson se usa el de DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'myFirstApiRest.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'myFirstApiRest.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 SPECTACULAR_SETTINGS = {
@@ -150,6 +205,38 @@ SIMPLE_JWT = {
 "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 "ROTATE_REFRESH_TOKENS": True,
 "BLACKLIST_AFTER_ROTATION": True,
+"TOKEN_REFRESH_SERIALIZER": "users.serializers.FilteredTokenRefreshSerializer",
+}
+
+# Filtro de Bloom delante de la lista negra de refresh tokens (users/blacklist.py).
+# 'auto' solo lo activa con una caché compartida entre procesos (no locmem).
+# 100.000 jti con un 0,1 % de falsos positivos ocupan unos 180 KB por proceso.
+USERS_BLACKLIST_BLOOM = os.getenv('USERS_BLACKLIST_BLOOM', 'auto')
+USERS_BLACKLIST_BLOOM_CAPACITY = int(os.getenv('USERS_BLACKLIST_BLOOM_CAPACITY', '100000'))
+USERS_BLACKLIST_BLOOM_ERROR_RATE = 0.001
+
+AUTH_USER_MODEL = 'users.CustomUser'
+# Segundos que CachedJWTAuthentication reutiliza un usuario sin volver a leerlo
+USERS_AUTH_CACHE_TIMEOUT = int(os.getenv('USERS_AUTH_CACHE_TIMEOUT', '60'))
+
+# Métricas por endpoint publicadas en /api/metrics/ (myFirstApiRest/metrics.py)
+METRICS = {
+    'ENABLED': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+    'SAMPLE_RATE': float(os.getenv('METRICS_SAMPLE_RATE', '1.0')),
+    'SLOW_QUERY_MS': float(os.getenv('METRICS_SLOW_QUERY_MS', '200')),
+    'BUCKETS_MS': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    # Sin TOKEN solo lo ven los usuarios staff (sesión de la administración); PUBLIC lo abre a todos
+    'TOKEN': os.getenv('METRICS_TOKEN'),
+    'PUBLIC': os.getenv('METRICS_PUBLIC', 'false').lower() == 'true',
 }
 
-AUTH_USER_MODEL = 'users.CustomUser'
\ No newline at end of file
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'myFirstApiRest.metrics': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
\ No newline at end of file
@@ -10,7 +10,9 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from myFirstApiRest.db import open_pools
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myFirstApiRest.settings")
 
 application = get_wsgi_application()
+open_pools()
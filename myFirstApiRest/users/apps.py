@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from myFirstApiRest.metrics import registry
+        from .blacklist import prometheus_lines
+        registry.register_collector(prometheus_lines)
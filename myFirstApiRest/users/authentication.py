@@ -0,0 +1,70 @@
+"""
+Autenticación JWT sin consultar CustomUser en cada petición.
+
+JWTAuthentication de simplejwt lee el usuario de la base de datos en cada
+petición autenticada. CachedJWTAuthentication guarda en la caché de
+auctions/cache.py solo lo que necesitan la autenticación y los permisos
+(AUTH_FIELDS y el md5 del hash de la contraseña, nunca el hash) en el espacio
+de nombres 'user:<id>', con una variante por cada valor del claim de
+revocación del token. users/signals.py invalida el espacio al guardar o borrar
+el usuario, y la entrada caduca a los USERS_AUTH_CACHE_TIMEOUT segundos por si
+se modifica sin señales (queryset.update()).
+
+request.user se construye con esos campos; el resto queda diferido. Las
+vistas que leen o guardan el perfil completo vuelven a leer la fila
+(users/views.py), así un save() nunca escribe valores cacheados.
+"""
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from auctions import cache
+
+# Campos de CustomUser que se cachean (permisos: is_staff, is_superuser)
+AUTH_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        def load():
+            row = (self.user_model.objects
+                   .filter(**{api_settings.USER_ID_FIELD: user_id})
+                   .values(*AUTH_FIELDS, 'password')
+                   .first())
+            if row is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            row['password_digest'] = get_md5_hash_password(row.pop('password'))
+            return row
+
+        revoke_claim = str(validated_token.get(api_settings.REVOKE_TOKEN_CLAIM, ''))
+        row = cache.read_through('auth_user', user_namespace(user_id), revoke_claim, load,
+                                 timeout=getattr(settings, 'USERS_AUTH_CACHE_TIMEOUT', 60))
+
+        # Las mismas comprobaciones que JWTAuthentication, también con el usuario cacheado
+        if api_settings.CHECK_USER_IS_ACTIVE and not row['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and revoke_claim != row['password_digest']:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return self.build_user(row)
+
+    def build_user(self, row):
+        # Instancia "cargada de la base de datos" con los demás campos diferidos
+        fields = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in row]
+        return self.user_model.from_db(self.user_model.objects.db, fields, [row[name] for name in fields])
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # Mismo esquema de seguridad (Bearer) en la documentación de drf-spectacular
+    target_class = CachedJWTAuthentication
@@ -0,0 +1,194 @@
+"""
+Lista negra de refresh tokens: filtro de Bloom delante de la consulta y poda de
+tokens caducados.
+
+Con ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION cada /api/token/refresh/
+comprueba en la base de datos si el token está en la lista negra, y casi nunca
+lo está. Cada proceso guarda en un filtro de Bloom los jti de la lista negra: si
+el filtro dice que un jti no está, seguro que no está y se evita la consulta; si
+dice que puede estar, decide la base de datos.
+
+Para ver lo que han añadido otros procesos, al guardar un BlacklistedToken se
+invalida el espacio de nombres 'token-blacklist' de auctions/cache.py. Cuando su
+generación cambia, el filtro lee de la base de datos las filas nuevas (id mayor
+que el último visto, más los huecos de transacciones que aún no habían hecho
+commit). Un hueco no se descarta nunca: si sigue sin aparecer pasados
+PENDING_TIMEOUT segundos, el filtro se reconstruye leyendo la tabla entera.
+
+Con varios procesos la caché tiene que ser compartida (Redis, Memcached): con
+una caché local un proceso no se entera de lo que añaden los demás y dejaría
+pasar un token de la lista negra. Por eso, con USERS_BLACKLIST_BLOOM='auto' (por
+defecto) el filtro solo se usa si la caché es compartida; si no, cada refresh
+consulta la base de datos como RefreshToken.check_blacklist().
+"""
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Q
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from auctions import cache
+
+NAMESPACE = 'token-blacklist'
+PRUNE_STATS_KEY = 'users:token-prune'
+# Segundos que se busca un id saltado solo por su id; después se relee la tabla entera
+PENDING_TIMEOUT = 60
+# Al leer la tabla entera solo se vigilan los huecos entre los últimos MAX_PENDING ids
+MAX_PENDING = 1000
+
+
+def filter_enabled():
+    """USERS_BLACKLIST_BLOOM: 'auto' (solo con caché compartida), True o False."""
+    value = getattr(settings, 'USERS_BLACKLIST_BLOOM', 'auto')
+    if isinstance(value, str) and value.lower() == 'auto':
+        return not isinstance(cache.get_cache(), (LocMemCache, DummyCache))
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'on')
+    return bool(value)
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de dos hashes
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BlacklistFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checks = {'skipped': 0, 'database': 0}
+        self.reset()
+
+    def reset(self):
+        self.enabled = filter_enabled()
+        self.capacity = getattr(settings, 'USERS_BLACKLIST_BLOOM_CAPACITY', 100_000)
+        self.bloom = BloomFilter(self.capacity, getattr(settings, 'USERS_BLACKLIST_BLOOM_ERROR_RATE', 0.001))
+        self.generation = None
+        self.max_id = 0
+        self.pending = {}
+
+    def might_be_blacklisted(self, jti):
+        if not self.enabled:
+            self.checks['database'] += 1
+            return True
+        with self._lock:
+            self._sync()
+            found = jti in self.bloom
+            self.checks['database' if found else 'skipped'] += 1
+            return found
+
+    def _sync(self):
+        now = time.monotonic()
+        generation = cache.generation(NAMESPACE)
+        expired = any(now - since >= PENDING_TIMEOUT for since in self.pending.values())
+        if generation == self.generation and not expired:
+            return
+        if expired or self.bloom.count > self.capacity:
+            # Un hueco antiguo puede ser una transacción lenta que ya hizo commit: se relee
+            # todo. Con demasiados falsos positivos también (prune_tokens habrá borrado los caducados)
+            self.reset()
+        # La generación se lee antes de la consulta: si cambia mientras tanto, se vuelve a leer
+        self.generation = generation
+        rows = BlacklistedToken.objects.filter(Q(pk__gt=self.max_id) | Q(pk__in=list(self.pending)))
+        seen = set()
+        for pk, jti in rows.values_list('pk', 'token__jti'):
+            self.bloom.add(jti)
+            seen.add(pk)
+            self.pending.pop(pk, None)
+
+        new_max = max(seen, default=self.max_id)
+        # En la carga completa los huecos antiguos son filas borradas por prune_tokens
+        start = self.max_id + 1 if self.max_id else max(1, new_max - MAX_PENDING)
+        for pk in range(start, new_max):
+            if pk not in seen:
+                self.pending.setdefault(pk, now)
+        self.max_id = max(self.max_id, new_max)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken que solo consulta la lista negra si el filtro de Bloom lo pide."""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def prune_expired_tokens(now, batch_size, pause=0):
+    """
+    Borra los tokens caducados (y su entrada en la lista negra) por lotes, cada
+    uno en su transacción para no bloquear las tablas. Devuelve las filas
+    borradas de OutstandingToken.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by('expires_at', 'id').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            # La cascada borra las filas de BlacklistedToken; only('pk') evita leer el texto de los tokens
+            OutstandingToken.objects.filter(pk__in=ids).only('pk').delete()
+        total += len(ids)
+        if pause:
+            time.sleep(pause)
+
+
+def record_prune(deleted, seconds):
+    """Guarda en la caché compartida el resultado de la última poda para /api/metrics/."""
+    cache.get_cache().set(PRUNE_STATS_KEY, {
+        'deleted': deleted,
+        'seconds': seconds,
+        'finished_at': time.time(),
+        'outstanding': OutstandingToken.objects.count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+    }, timeout=None)
+
+
+def prometheus_lines():
+    lines = [
+        '# HELP users_token_blacklist_checks_total Comprobaciones de la lista negra en el refresh.',
+        '# TYPE users_token_blacklist_checks_total counter',
+    ]
+    for result, count in sorted(blacklist_filter.checks.items()):
+        lines.append(f'users_token_blacklist_checks_total{{result="{result}"}} {count}')
+
+    last = cache.get_cache().get(PRUNE_STATS_KEY)
+    if last:
+        rate = last['deleted'] / last['seconds'] if last['seconds'] else 0
+        gauges = (
+            ('users_token_outstanding_rows', 'Filas de OutstandingToken tras la última poda.', last['outstanding']),
+            ('users_token_blacklisted_rows', 'Filas de BlacklistedToken tras la última poda.', last['blacklisted']),
+            ('users_token_prune_deleted', 'Tokens borrados en la última poda.', last['deleted']),
+            ('users_token_prune_rows_per_second', 'Velocidad de la última poda.', f'{rate:.1f}'),
+            ('users_token_prune_last_run_timestamp_seconds', 'Fin de la última poda.', f"{last['finished_at']:.0f}"),
+        )
+        for name, help_text, value in gauges:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+    return lines
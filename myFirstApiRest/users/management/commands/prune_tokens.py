@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.utils import aware_utcnow
+from users.blacklist import prune_expired_tokens, record_prune
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra por lotes los refresh tokens caducados y sus entradas en la lista negra. "
+        "Pensado para ejecutarse periódicamente (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Segundos de espera entre lotes para repartir la carga.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        deleted = prune_expired_tokens(aware_utcnow(), options['batch_size'], options['pause'])
+        seconds = time.perf_counter() - start
+        record_prune(deleted, seconds)
+        rate = deleted / seconds if seconds else 0
+        self.stdout.write(f"{deleted} tokens caducados borrados en {seconds:.2f} s ({rate:.0f}/s)")
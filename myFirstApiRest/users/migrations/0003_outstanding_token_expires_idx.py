@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 09:12
+
+from django.db import migrations
+
+# prune_tokens borra por expires_at y la tabla de simplejwt no tiene índice en
+# esa columna. El modelo es de otra app, así que el índice se crea con SQL.
+CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS outstanding_token_expires_idx
+    ON token_blacklist_outstandingtoken (expires_at, id);
+"""
+
+DROP_INDEX = "DROP INDEX IF EXISTS outstanding_token_expires_idx;"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_hot_path_indexes"),
+        ("token_blacklist", "0012_alter_outstandingtoken_user"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, DROP_INDEX),
+    ]
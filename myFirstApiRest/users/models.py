@@ -6,3 +6,10 @@ class CustomUser(AbstractUser):
     locality = models.CharField(max_length=100, blank=True)
     municipality = models.CharField(max_length=100, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        swappable = 'AUTH_USER_MODEL'
+        indexes = [
+            # UserSerializer.validate_email busca por email en cada alta/edición
+            models.Index(fields=['email'], name='user_email_idx'),
+        ]
+
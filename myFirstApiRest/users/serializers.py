@@ -1,6 +1,9 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .blacklist import FilteredRefreshToken
+from myFirstApiRest.fieldsets import SparseFieldsetMixin
 from .models import CustomUser
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'first_name', 'last_name' ,'username', 'email', 'birth_date', 'municipality','locality', 'password')
@@ -15,4 +18,8 @@ class UserSerializer(serializers.ModelSerializer):
 
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True)
-    new_password = serializers.CharField(required=True)
\ No newline at end of file
+    new_password = serializers.CharField(required=True)
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    # Comprobación de la lista negra con el filtro de Bloom de users/blacklist.py
+    token_class = FilteredRefreshToken
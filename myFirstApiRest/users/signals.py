@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from auctions import cache
+from .authentication import user_namespace
+from .blacklist import NAMESPACE as BLACKLIST_NAMESPACE
+from .models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    # Perfil, administración y cambio de contraseña: CachedJWTAuthentication vuelve a leerlo
+    cache.invalidate(user_namespace(instance.pk))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, created, **kwargs):
+    # Los filtros de Bloom de los demás procesos leen las filas nuevas
+    if created:
+        cache.invalidate(BLACKLIST_NAMESPACE)
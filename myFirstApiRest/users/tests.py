@@ -1,3 +1,151 @@
-from django.test import TestCase
+import time
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from auctions import cache as auth_cache
+from auctions.cache import generation, get_cache
+from myFirstApiRest.metrics import registry
+from .authentication import AUTH_FIELDS
+from .blacklist import NAMESPACE, PENDING_TIMEOUT, BlacklistFilter, blacklist_filter
+from .models import CustomUser
 
-# Create your tests here.
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = CustomUser.objects.create_user(username='cached', password='secret-pass-123',
+                                                   birth_date=date(1990, 1, 1))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/profile/')
+        user_queries = [q for q in queries.captured_queries if 'users_customuser' in q['sql']]
+        return response, len(user_queries)
+
+    def test_user_is_cached(self):
+        self.assertEqual(self.profile()[1], 2)  # autenticación + perfil
+        response, queries = self.profile()
+        self.assertEqual(response.json()['username'], 'cached')
+        self.assertEqual(queries, 1)
+
+    def test_profile_update_invalidates(self):
+        self.profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/users/profile/', {'locality': 'Donostia'}, format='json')
+        response, queries = self.profile()
+        self.assertEqual(response.json()['locality'], 'Donostia')
+        self.assertEqual(queries, 2)
+
+    def test_cache_holds_no_password_hash(self):
+        cached, original = [], auth_cache.read_through
+
+        def read_through(*args, **kwargs):
+            cached.append(original(*args, **kwargs))
+            return cached[-1]
+
+        with mock.patch('users.authentication.cache.read_through', side_effect=read_through):
+            self.profile()
+        self.assertEqual(set(cached[0]), set(AUTH_FIELDS) | {'password_digest'})
+        self.assertNotIn(self.user.password, cached[0].values())
+
+    @override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'CHECK_REVOKE_TOKEN': True})
+    def test_new_password_token_skips_stale_entry(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.profile()[0].status_code, 200)
+        # Sin señales (queryset.update): la entrada cacheada sigue ahí, pero con otro claim
+        self.user.set_password('another-pass-456')
+        CustomUser.objects.filter(pk=self.user.pk).update(password=self.user.password)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.profile()[0].status_code, 200)
+
+    def test_profile_update_keeps_other_columns(self):
+        self.profile()
+        last_login = timezone.now() - timedelta(days=1)
+        CustomUser.objects.filter(pk=self.user.pk).update(last_login=last_login)
+        self.assertEqual(self.client.patch('/api/users/profile/', {'locality': 'Bilbo'}, format='json').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.locality, self.user.last_login), ('Bilbo', last_login))
+
+    def test_deleted_user_is_rejected(self):
+        self.profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/api/users/profile/')
+        self.assertEqual(self.profile()[0].status_code, 401)
+
+
+# Un solo proceso: la caché local basta para probar el filtro
+@override_settings(USERS_BLACKLIST_BLOOM=True)
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        blacklist_filter.reset()
+        blacklist_filter.checks.update(skipped=0, database=0)
+        self.addCleanup(blacklist_filter.reset)
+        self.user = CustomUser.objects.create_user(username='refresher', password='secret-pass-123',
+                                                   birth_date=date(1990, 1, 1))
+        self.client = APIClient()
+
+    def refresh(self, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_refresh_skips_database_and_rejects_rotated_token(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(blacklist_filter.checks['skipped'], 1)
+
+        # El token rotado ya está en la lista negra y el filtro lo manda a la base de datos
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(blacklist_filter.checks['database'], 1)
+        self.assertEqual(self.refresh(response.json()['refresh']).status_code, 200)
+
+    def test_local_cache_disables_filter(self):
+        # Con 'auto' y locmem otro proceso no vería la generación nueva: se consulta siempre la base de datos
+        with self.settings(USERS_BLACKLIST_BLOOM='auto'):
+            blacklist_filter.reset()
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        other = RefreshToken.for_user(self.user)
+        self.client.post('/api/token/refresh/', {'refresh': str(other)}, format='json')  # sin on_commit: no cambia la generación
+        self.assertEqual(self.refresh(other).status_code, 401)
+        self.assertEqual(blacklist_filter.checks, {'skipped': 0, 'database': 3})
+
+    def test_old_gap_rereads_blacklist(self):
+        first, second = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(first).status_code, 200)
+        self.assertEqual(self.refresh(second).status_code, 200)
+        # Otro proceso con la generación al día que vio la fila de `second` pero no la
+        # de `first` (transacción lenta): el hueco caduca y se relee la tabla
+        first_row, last_row = BlacklistedToken.objects.order_by('pk').values_list('pk', flat=True)
+        other = BlacklistFilter()
+        other.generation, other.max_id = generation(NAMESPACE), last_row
+        other.pending = {first_row: time.monotonic() - PENDING_TIMEOUT}
+        self.assertTrue(other.might_be_blacklisted(first['jti']))
+        self.assertEqual(other.pending, {})
+
+    def test_prune_tokens(self):
+        now = timezone.now()
+        expired = [OutstandingToken.objects.create(jti=f'expired-{i}', token='x', expires_at=now - timedelta(days=1))
+                   for i in range(3)]
+        BlacklistedToken.objects.create(token=expired[0])
+        valid = RefreshToken.for_user(self.user)
+
+        out = StringIO()
+        call_command('prune_tokens', batch_size=2, stdout=out)
+        self.assertIn('3 tokens caducados borrados', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [valid['jti']])
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertIn('users_token_prune_deleted 3', registry.render())
+        self.assertIn('users_token_outstanding_rows 1', registry.render())
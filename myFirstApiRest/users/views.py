@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from auctions.query_planning import OptimizedQuerysetMixin
 
 class UserRegisterView(generics.CreateAPIView):
     permission_classes = [AllowAny]
@@ -25,10 +26,10 @@ class UserRegisterView(generics.CreateAPIView):
         return Response(serializer.errors,
         status=status.HTTP_400_BAD_REQUEST)
     
-class UserListView(generics.ListAPIView):
+class UserListView(OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAdminUser]
     serializer_class = UserSerializer
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.order_by('id')
 
 class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAdminUser]
@@ -52,13 +53,17 @@ class LogoutView(APIView):
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
+def current_user(request):
+    # request.user solo trae los campos cacheados (users/authentication.py): se lee la fila completa
+    return CustomUser.objects.get(pk=request.user.pk)
+
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(current_user(request), context={'request': request})
         return Response(serializer.data)
     def patch(self, request):
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        serializer = UserSerializer(current_user(request), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -72,7 +77,7 @@ class ChangePasswordView(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request):
         serializer = ChangePasswordSerializer(data=request.data)
-        user = request.user
+        user = current_user(request)
         if serializer.is_valid():
             if not user.check_password(serializer.validated_data['old_password']):
                 return Response({"old_password": "Incorrect current password."},status=status.HTTP_400_BAD_REQUEST)
@@ -81,6 +86,6 @@ class ChangePasswordView(APIView):
             except ValidationError as e:
                 return Response({"new_password": e.messages},status=status.HTTP_400_BAD_REQUEST)
             user.set_password(serializer.validated_data['new_password'])
-            user.save()
+            user.save(update_fields=['password'])
             return Response({"detail": "Password updated successfully."})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file